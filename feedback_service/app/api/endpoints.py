@@ -2,6 +2,7 @@ from fastapi import APIRouter, UploadFile, File, Form
 from fastapi.responses import JSONResponse
 import time
 import asyncio
+import functools
 from typing import Dict, Any
 import logging
 import os
@@ -102,7 +103,10 @@ async def api_wpm_calculator(file: UploadFile = File(...), language: str = Form(
     try:
         file_path = await analyzers["file_processor"].save_uploaded_file(file)
         audio_path, _, _ = await analyzers["file_processor"].extract_components(file_path)
-        result = await analyzers["wpm_calculator"].analyze(audio_path, language=language, context='presentation')
+        # analyze() decodes, runs the VAD and waits on transcription; keep all of it off the event loop
+        result = await asyncio.get_event_loop().run_in_executor(
+            None, analyzers["wpm_calculator"].analyze, audio_path, language, 'presentation'
+        )
         return JSONResponse(content=result, status_code=200)
     except Exception as e:
         logger.error(f"WPM calculator API error: {e}")
@@ -175,12 +179,18 @@ async def api_enhanced_overall_feedback(file: UploadFile = File(...), language:
         file_path = await analyzers["file_processor"].save_uploaded_file(file)
         audio_path, video_path, has_video = await analyzers["file_processor"].extract_components(file_path)
         logger.info("Pre-transcribing audio for all models...")
-        transcription = await analyzers["transcription_service"].get_transcription(audio_path, language)
+        # Decode once at 16 kHz; Whisper and the WPM calculator both reuse the buffer
+        speech_audio = await asyncio.get_event_loop().run_in_executor(None, analyzers["wpm_calculator"].load_audio, audio_path)
+        transcription, transcript_segments = await analyzers["transcription_service"].get_transcription_with_segments(audio_path, language, audio_data=speech_audio)
         transcript_result = {"text": transcription} if transcription else {"text": ""}
+        wpm_result = await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(analyzers["wpm_calculator"].analyze, audio_path, language=language, context='presentation',
+                                    transcript=transcription, audio_data=speech_audio, transcript_segments=transcript_segments)
+        )
         results = {}
         analysis_tasks = [
             ("speech_emotion", analyzers["speech_emotion"].analyze(audio_path)),
-            ("wpm_analysis", analyzers["wpm_calculator"].analyze(audio_path, language=language, context='presentation', transcript=transcription)),
+            ("wpm_analysis", wpm_result),
             ("pitch_analysis", analyzers["pitch_analysis"].analyze(audio_path)),
             ("volume_consistency", analyzers["volume_consistency"].analyze(audio_path)),
             ("filler_detection", analyzers["filler_detection"].analyze(audio_path, language=language, transcript_result=transcript_result)),
@@ -230,12 +240,18 @@ async def api_overall_feedback(file: UploadFile = File(...), language: str = For
         file_path = await analyzers["file_processor"].save_uploaded_file(file)
         audio_path, video_path, has_video = await analyzers["file_processor"].extract_components(file_path)
         logger.info("Pre-transcribing audio for all models...")
-        transcription = await analyzers["transcription_service"].get_transcription(audio_path, language)
+        # Decode once at 16 kHz; Whisper and the WPM calculator both reuse the buffer
+        speech_audio = await asyncio.get_event_loop().run_in_executor(None, analyzers["wpm_calculator"].load_audio, audio_path)
+        transcription, transcript_segments = await analyzers["transcription_service"].get_transcription_with_segments(audio_path, language, audio_data=speech_audio)
         transcript_result = {"text": transcription} if transcription else {"text": ""}
+        wpm_result = await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(analyzers["wpm_calculator"].analyze, audio_path, language=language, context='presentation',
+                                    transcript=transcription, audio_data=speech_audio, transcript_segments=transcript_segments)
+        )
         results = {}
         analysis_tasks = [
             ("speech_emotion", analyzers["speech_emotion"].analyze(audio_path)),
-            ("wpm_analysis", analyzers["wpm_calculator"].analyze(audio_path, language=language, context='presentation', transcript=transcription)),
+            ("wpm_analysis", wpm_result),
             ("pitch_analysis", analyzers["pitch_analysis"].analyze(audio_path)),
             ("volume_consistency", analyzers["volume_consistency"].analyze(audio_path)),
             ("filler_detection", analyzers["filler_detection"].analyze(audio_path, language=language, transcript_result=transcript_result)),
@@ -286,12 +302,18 @@ async def api_audio_only_feedback(file: UploadFile = File(...), language: str =
         file_path = await analyzers["file_processor"].save_uploaded_file(file)
         audio_path, _, _ = await analyzers["file_processor"].extract_components(file_path)
         logger.info("Pre-transcribing audio for all models...")
-        transcription = await analyzers["transcription_service"].get_transcription(audio_path, language)
+        # Decode once at 16 kHz; Whisper and the WPM calculator both reuse the buffer
+        speech_audio = await asyncio.get_event_loop().run_in_executor(None, analyzers["wpm_calculator"].load_audio, audio_path)
+        transcription, transcript_segments = await analyzers["transcription_service"].get_transcription_with_segments(audio_path, language, audio_data=speech_audio)
         transcript_result = {"text": transcription} if transcription else {"text": ""}
+        wpm_result = await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(analyzers["wpm_calculator"].analyze, audio_path, language=language, context='presentation',
+                                    transcript=transcription, audio_data=speech_audio, transcript_segments=transcript_segments)
+        )
         results = {}
         analysis_tasks = [
             ("speech_emotion", analyzers["speech_emotion"].analyze(audio_path)),
-            ("wpm_analysis", analyzers["wpm_calculator"].analyze(audio_path, language=language, context='presentation', transcript=transcription)),
+            ("wpm_analysis", wpm_result),
             ("pitch_analysis", analyzers["pitch_analysis"].analyze(audio_path)),
             ("volume_consistency", analyzers["volume_consistency"].analyze(audio_path)),
             ("filler_detection", analyzers["filler_detection"].analyze(audio_path, language=language, transcript_result=transcript_result)),
@@ -491,7 +513,11 @@ async def api_custom_feedback(
             return JSONResponse(content={"error": "Either file or file_path must be provided"}, status_code=400)
         
         audio_path, video_path, has_video = await analyzers["file_processor"].extract_components(input_file_path)
-        transcription = await analyzers["transcription_service"].get_transcription(audio_path, language)
+        # Decode once at 16 kHz; Whisper and the WPM calculator both reuse the buffer
+        speech_audio = None
+        if audio_path:
+            speech_audio = await asyncio.get_event_loop().run_in_executor(None, analyzers["wpm_calculator"].load_audio, audio_path)
+        transcription, transcript_segments = await analyzers["transcription_service"].get_transcription_with_segments(audio_path, language, audio_data=speech_audio)
         transcript_result = {"text": transcription} if transcription else {"text": ""}
         requested_services = [s.strip() for s in services.split(",") if s.strip()]
         results = {}
@@ -502,7 +528,7 @@ async def api_custom_feedback(
             "filler_detection": ("filler_detection", "audio", "analyze", {"language": language, "transcript_result": transcript_result}),
             "stutter_detection": ("stutter_detection", "audio", "analyze", {}),
             "lexical_richness": ("lexical_richness", "audio", "analyze", {"transcript": transcription, "language": language}),
-            "wpm_analysis": ("wpm_calculator", "audio", "analyze", {"language": language, "context": "presentation", "transcript": transcription}),
+            "wpm_analysis": ("wpm_calculator", "audio", "analyze", {"language": language, "context": "presentation", "transcript": transcription, "audio_data": speech_audio, "transcript_segments": transcript_segments}),
             "keyword_relevance": ("keyword_relevance", "audio", "analyze", {"language": language, "transcript": transcription, "target_keywords": topic}),
             "facial_emotion": ("facial_emotion", "video", "analyze", {}),
             "eye_contact": ("eye_contact", "video", "analyze_eye_contact", {}),
@@ -536,6 +562,10 @@ async def api_custom_feedback(
                 if service == "lexical_richness":
                     # lexical_richness.analyze() expects (transcript, language) not (audio_path, **kwargs)
                     result = analyze_method(transcription, language=language)
+                elif service == "wpm_analysis":
+                    result = await asyncio.get_event_loop().run_in_executor(
+                        None, functools.partial(analyze_method, input_path, **extra_kwargs)
+                    )
                 elif extra_kwargs:
                     result = analyze_method(input_path, **extra_kwargs)
                 else:
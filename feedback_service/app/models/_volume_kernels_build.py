@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Warm the numba on-disk cache for the volume consistency kernels at image build time.
+Run from the service root:
+
+    python -m app.models._volume_kernels_build
+
+All kernels are @njit(cache=True), so compiling them once here writes the cache next to
+volume_consistency.py and the first request loads machine code instead of JIT-compiling.
+"""
+
+
+def build():
+    from app.models import volume_consistency as vc
+
+    # The analyzer's constructor runs its kernel warmup, which writes the JIT cache
+    vc.VolumeConsistencyAnalyzer()
+
+
+if __name__ == "__main__":
+    build()
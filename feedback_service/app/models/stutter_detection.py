@@ -1,65 +1,310 @@
 import torch
+import torchaudio
 import numpy as np
+import soundfile as sf
 from transformers import AutoFeatureExtractor, AutoModelForAudioClassification, pipeline
 import librosa
+import bisect
 import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any
 
 logger = logging.getLogger(__name__)
 
+STUTTER_LABELS = {"repetition", "prolongation", "blocks", "stutter", "1"}
+SILENCE_RMS_THRESHOLD = 1e-3
+MAX_BATCH = 16
+
+_io_pool = ThreadPoolExecutor(max_workers=2)
+
 class StutterDetectionAnalyzer:
-    def __init__(self, segment_duration: float = 5.0):
+    _shared_model = None
+    _shared_feature_extractor = None
+    _shared_pipeline = None
+    _shared_onnx_session = None
+    _load_attempted = False
+    _load_lock = threading.Lock()
+
+    # Fluency score lower bounds (inclusive) and stutter probability upper bounds (inclusive), ascending
+    _ASSESSMENT_THRESHOLDS = (3.0, 5.0, 7.0, 9.0)
+    _ASSESSMENTS = (
+        "Severe stuttering detected, professional speech therapy strongly recommended.",
+        "Significant stuttering detected, speech therapy recommended.",
+        "Moderate speech fluency with noticeable stuttering patterns.",
+        "Good speech fluency with occasional stuttering.",
+        "Excellent speech fluency with minimal stuttering detected.",
+    )
+    _RECOMMENDATION_THRESHOLDS = (0.2, 0.4, 0.7)
+    _RECOMMENDATIONS = (
+        ("Excellent speech fluency! Continue maintaining your current speaking practices.",),
+        (
+            "Continue practicing clear articulation and pacing.",
+            "Consider recording presentations to identify improvement areas.",
+            "Practice speaking in front of a mirror to build confidence.",
+        ),
+        (
+            "Practice speaking at a slower pace, especially during presentations.",
+            "Use relaxation techniques before speaking engagements.",
+            "Consider joining a speech improvement group or workshop.",
+            "Focus on maintaining steady breathing while speaking.",
+        ),
+        (
+            "Consider working with a speech therapist for targeted stutter reduction techniques.",
+            "Practice slow, deliberate speech with frequent pauses.",
+            "Use breathing exercises to maintain steady speech rhythm.",
+            "Record yourself speaking and identify specific trigger words or situations.",
+        ),
+    )
+
+    def __init__(self, segment_duration: float = 5.0, verbose: bool = False):
         self.model_name = "HareemFatima/distilhubert-finetuned-stutterdetection"
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        torch.set_grad_enabled(False)
         self.sample_rate = 16000
         self.segment_duration = segment_duration
         self.segment_samples = int(self.segment_duration * self.sample_rate)
+        self.verbose = verbose
+        self._segment_details: List[Dict[str, Any]] = []
+        self._warm = False
         self.model = None
         self.feature_extractor = None
         self.pipeline = None
+        self._onnx_session = None
+        self._copy_stream = None
+        self._host_buffer = None
+        if self.device.type == "cuda":
+            torch.backends.cudnn.benchmark = True
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.set_float32_matmul_precision("high")
+            self._copy_stream = torch.cuda.Stream()
+            self._host_buffer = torch.empty((MAX_BATCH, self.segment_samples), dtype=torch.float32, pin_memory=True)
+        else:
+            torch.set_num_threads(os.cpu_count() or 1)
+        # Scoring belongs to the classifier, not to how it was loaded: the direct load and the pipeline
+        # fallback run the same model, which the service has always scored as the pipeline at 0.7
+        self._analysis_method = "huggingface_pipeline"
+        self._detection_threshold = 0.7
+        self._ensure_model()
+
+    def _ensure_model(self):
+        """Load the shared model once per process and bind it to this instance."""
+        cls = StutterDetectionAnalyzer
+        if not cls._load_attempted:
+            with cls._load_lock:
+                if not cls._load_attempted:
+                    self._load_model()
+                    cls._shared_model = self.model
+                    cls._shared_feature_extractor = self.feature_extractor
+                    cls._shared_pipeline = self.pipeline
+                    cls._shared_onnx_session = self._onnx_session
+                    cls._load_attempted = True
+        if self.model is cls._shared_model:
+            return
+        self.model = cls._shared_model
+        self.feature_extractor = cls._shared_feature_extractor
+        self.pipeline = cls._shared_pipeline
+        self._onnx_session = cls._shared_onnx_session
+        self._bind_model_settings()
 
+    def _load_model(self):
         try:
-            self.pipeline = pipeline(
-                "audio-classification",
-                model=self.model_name,
-                device=0 if torch.cuda.is_available() else -1
-            )
-            logger.info(f"Stutter detection pipeline loaded on {self.device}")
+            self.feature_extractor = AutoFeatureExtractor.from_pretrained(self.model_name)
+            self.model = self._load_quantized_model()
+            logger.info(f"Stutter detection model loaded on {self.device}")
         except Exception as e:
-            logger.warning(f"Failed to load pipeline, trying manual model loading: {e}")
+            logger.warning(f"Failed to load stutter model directly, trying pipeline: {e}")
+            self.model = None
             try:
-                self.feature_extractor = AutoFeatureExtractor.from_pretrained(self.model_name)
-                self.model = AutoModelForAudioClassification.from_pretrained(self.model_name)
-                self.model.to(self.device)
-                self.model.eval()
-                logger.info(f"Stutter detection model loaded manually on {self.device}")
+                self.pipeline = pipeline(
+                    "audio-classification",
+                    model=self.model_name,
+                    device=0 if torch.cuda.is_available() else -1
+                )
+                self.model = self.pipeline.model
+                if self.device.type == "cuda":
+                    self.model = self.model.to(self._half_dtype())
+                else:
+                    self.model = self._quantize_dynamic(self.model.eval())
+                self.feature_extractor = self.pipeline.feature_extractor
+                logger.info(f"Stutter detection pipeline loaded on {self.device}")
             except Exception as e2:
                 logger.error(f"Error loading stutter detection model: {e2}")
 
+        if self.model is not None:
+            self._bind_model_settings()
+            if self.device.type == "cuda":
+                self._compile_model()
+
+    def _bind_model_settings(self):
+        if self.model is None:
+            return
+        self._stutter_columns = self._resolve_stutter_columns()
+        self._do_normalize = getattr(self.feature_extractor, "do_normalize", True)
+        self._use_feature_extractor = False
+        self._use_feature_extractor = not self._normalization_matches_extractor()
+        if self._use_feature_extractor:
+            logger.warning("Stutter feature extractor differs from inline normalisation, using the extractor")
+
+    def _normalization_matches_extractor(self) -> bool:
+        """Check once that inline normalisation reproduces the feature extractor on raw mono audio."""
+        if getattr(self.feature_extractor, "feature_size", 1) != 1:
+            return False
+        try:
+            probe = np.random.default_rng(0).standard_normal((2, self.sample_rate // 10)).astype(np.float32)
+            expected = self.feature_extractor(list(probe), sampling_rate=self.sample_rate, return_tensors="np")["input_values"]
+            with torch.inference_mode():
+                actual = self._normalize(torch.from_numpy(probe)).numpy()
+            return expected.shape == actual.shape and np.allclose(expected, actual, atol=1e-4)
+        except Exception as e:
+            logger.warning(f"Could not validate stutter feature normalisation: {e}")
+            return False
+
+    def _compile_model(self):
+        """Compile the model with CUDA graphs and pay the compile cost once, at load time."""
+        eager_model = self.model
+        try:
+            self.model = torch.compile(eager_model, mode="reduce-overhead")
+            self._predict_probabilities(np.zeros((1, self.segment_samples), dtype=np.float32))
+            self._warm = True
+            logger.info("Stutter detection model compiled with torch.compile")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, using eager stutter model: {e}")
+            self.model = eager_model
+
+    def _resolve_stutter_columns(self) -> np.ndarray:
+        """Output columns whose label is a stutter class, falling back to the positive class."""
+        id2label = self.model.config.id2label
+        columns = [i for i, label in sorted(id2label.items()) if label.lower() in STUTTER_LABELS]
+        if not columns:
+            columns = [1 if len(id2label) >= 2 else 0]
+        return np.array(columns)
+
+    def _half_dtype(self) -> torch.dtype:
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+    def _load_quantized_model(self):
+        """Load the classifier with int8 linear layers (bitsandbytes on CUDA, dynamic quantization on CPU)."""
+        if self.device.type == "cuda":
+            try:
+                model = AutoModelForAudioClassification.from_pretrained(
+                    self.model_name, load_in_8bit=True, device_map="auto"
+                )
+                return model.eval()
+            except Exception as e:
+                logger.warning(f"8-bit loading unavailable, falling back to half precision: {e}")
+                model = AutoModelForAudioClassification.from_pretrained(self.model_name)
+                return model.to(self.device, dtype=self._half_dtype()).eval()
+
+        model = AutoModelForAudioClassification.from_pretrained(self.model_name)
+        model.eval()
+        self._onnx_session = self._build_onnx_session(model)
+        if self._onnx_session is not None:
+            return model
+        return self._quantize_dynamic(model)
+
+    def _quantize_dynamic(self, model):
+        """Quantize Linear layers to int8 for CPU, keeping the fp32 model if the result is not a valid softmax."""
+        try:
+            quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            dummy = torch.randn((1, self.segment_samples), dtype=torch.float32)
+            probs = torch.softmax(quantized(input_values=dummy).logits, dim=-1)
+            if not torch.isfinite(probs).all() or abs(float(probs.sum()) - 1.0) > 1e-3:
+                raise ValueError("quantized model produced an invalid softmax")
+            return quantized
+        except Exception as e:
+            logger.warning(f"Dynamic quantization failed, using fp32 model: {e}")
+            return model
+
+    def _build_onnx_session(self, model) -> Any:
+        """Open the cached int8 ONNX graph with ONNX Runtime, exporting it first if missing or unreadable."""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            logger.warning("onnxruntime not available, using PyTorch for CPU stutter inference")
+            return None
+        try:
+            onnx_dir = os.path.join(os.environ.get("TRANSFORMERS_CACHE", "/app/.cache/huggingface"), "onnx")
+            os.makedirs(onnx_dir, exist_ok=True)
+            revision = getattr(model.config, "_commit_hash", None) or "main"
+            stem = f"stutter_detection--{self.model_name.replace('/', '--')}--{revision}"
+            int8_path = os.path.join(onnx_dir, f"{stem}.int8.onnx")
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = None
+            if os.path.exists(int8_path):
+                try:
+                    session = ort.InferenceSession(int8_path, sess_options=options, providers=["CPUExecutionProvider"])
+                except Exception as e:
+                    logger.warning(f"Cached stutter ONNX model {int8_path} failed to load, rebuilding: {e}")
+            if session is None:
+                self._export_onnx(model, os.path.join(onnx_dir, stem), int8_path)
+                session = ort.InferenceSession(int8_path, sess_options=options, providers=["CPUExecutionProvider"])
+            logger.info("Stutter detection model running on ONNX Runtime")
+            return session
+        except Exception as e:
+            logger.warning(f"ONNX export failed, using PyTorch for CPU stutter inference: {e}")
+            return None
+
+    def _export_onnx(self, model, tmp_stem: str, int8_path: str):
+        """Export and quantize to process-private temp files, then move the int8 graph into place atomically."""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        fp32_tmp = f"{tmp_stem}.{os.getpid()}.tmp.onnx"
+        int8_tmp = f"{tmp_stem}.{os.getpid()}.tmp.int8.onnx"
+        try:
+            dummy = torch.zeros((1, self.segment_samples), dtype=torch.float32)
+            torch.onnx.export(
+                model, (dummy,), fp32_tmp,
+                input_names=["input_values"],
+                output_names=["logits"],
+                dynamic_axes={"input_values": {0: "batch", 1: "time"}, "logits": {0: "batch"}},
+                opset_version=17
+            )
+            quantize_dynamic(fp32_tmp, int8_tmp, weight_type=QuantType.QInt8)
+            os.replace(int8_tmp, int8_path)
+        finally:
+            for path in (fp32_tmp, int8_tmp):
+                if os.path.exists(path):
+                    os.remove(path)
+
     def analyze(self, audio_path: str) -> Dict[str, Any]:
         """Analyze speech fluency and detect stuttering patterns."""
-        logger.info(f"Starting Stutter Detection Analysis for {audio_path}")
+        logger.debug("Starting Stutter Detection Analysis for %s", audio_path)
         try:
-            audio_data = self._load_audio(audio_path)
+            stream_info = self._stream_info(audio_path)
+            if stream_info is not None:
+                decode_future = _io_pool.submit(self._decode_stream, audio_path, stream_info)
+            else:
+                decode_future = _io_pool.submit(self._load_audio, audio_path)
+            self._ensure_warm()
 
-            if self.pipeline is None and self.model is None:
-                return self._fallback_analysis(audio_data, audio_path)
+            if stream_info is not None:
+                segments, n_samples = decode_future.result()
+                audio_data = segments.reshape(-1)[:n_samples]
+            else:
+                audio_data = decode_future.result()
+                segments = None
+            if len(audio_data) == 0:
+                raise ValueError("Audio contains no samples")
 
-            segments = self._segment_audio(audio_data)
-            logger.info(f"Processing {len(segments)} segments of {self.segment_duration}s each")
+            if self.model is None:
+                return self._fallback_analysis(audio_data, audio_path)
 
-            segment_results = []
+            if segments is None:
+                segments = self._segment_audio(audio_data)
+            segment_results = self._analyze_segment_rows(segments)
             total_duration = len(audio_data) / self.sample_rate
 
-            for i, segment in enumerate(segments):
+            logger.info("Stutter analysis for %s: %d segments of %ss, %d above silence threshold",
+                        audio_path, len(segment_results), self.segment_duration,
+                        sum(seg["analysis_method"] != "silence_skipped" for seg in segment_results))
+
+            for i, segment_result in enumerate(segment_results):
                 segment_start_time = i * self.segment_duration
                 segment_end_time = min((i + 1) * self.segment_duration, total_duration)
-
-                if self.pipeline is not None:
-                    segment_result = self._analyze_segment_with_pipeline(segment)
-                else:
-                    segment_result = self._analyze_segment_with_model(segment)
-
                 segment_result.update({
                     "segment_id": i + 1,
                     "start_time": segment_start_time,
@@ -67,9 +312,7 @@ class StutterDetectionAnalyzer:
                     "duration": segment_end_time - segment_start_time
                 })
 
-                segment_results.append(segment_result)
-
-            return self._aggregate_segment_results(segment_results, audio_data, audio_path)
+            return self._aggregate_segment_results(segment_results, total_duration, audio_path)
 
         except Exception as e:
             logger.error(f"Error in stutter detection analysis: {e}")
@@ -84,82 +327,197 @@ class StutterDetectionAnalyzer:
                 "segments": []
             }
 
+    def _stream_info(self, audio_path: str):
+        """soundfile metadata when the file can be streamed block by block, else None."""
+        try:
+            info = sf.info(audio_path)
+        except Exception:
+            return None
+        return info if info.frames > 0 else None
+
+    def _decode_stream(self, audio_path: str, info):
+        """
+        Decode once, block by block, into a zero-padded (n_segments, segment_samples) batch of the mono mix at
+        16 kHz, peak-normalised after resampling like _load_audio. Returns the batch and the real sample count.
+        Each block is resampled with `context` native samples of its neighbours on both sides (zeros beyond the
+        ends, as torchaudio pads), so block edges match resampling the whole signal. Only the 16 kHz signal
+        is held in memory, never the native-rate decode.
+        """
+        sr = info.samplerate
+        g = math.gcd(sr, self.sample_rate)
+        orig, new = sr // g, self.sample_rate // g
+        # Reach of torchaudio's default sinc kernel in input samples, rounded up to whole resampler periods
+        reach = math.ceil(6 * orig / (0.99 * min(orig, new)))
+        context = orig * (reach // orig + 1) if sr != self.sample_rate else 0
+        step = orig * max(1, int(self.segment_duration * sr) // orig)
+        n_samples = -(-info.frames * new // orig)
+        n_segments = -(-n_samples // self.segment_samples)
+        audio = np.zeros(n_segments * self.segment_samples, dtype=np.float32)
+        window = np.zeros(context, dtype=np.float32)
+        written = 0
+        with sf.SoundFile(audio_path) as f:
+            while written < n_samples:
+                need = step + 2 * context - len(window)
+                chunk = f.read(need, dtype="float32", always_2d=True).mean(axis=1, dtype=np.float32)
+                window = np.concatenate([window, chunk, np.zeros(need - len(chunk), dtype=np.float32)])
+                if sr != self.sample_rate:
+                    resampled = torchaudio.functional.resample(torch.from_numpy(window), sr, self.sample_rate).numpy()
+                else:
+                    resampled = window
+                piece = resampled[context * new // orig:(context + step) * new // orig][:n_samples - written]
+                audio[written:written + len(piece)] = piece
+                written += len(piece)
+                window = window[step:]
+        peak = float(np.abs(audio).max())
+        if peak > 0:
+            audio *= 1.0 / peak
+        return audio.reshape(n_segments, self.segment_samples), n_samples
+
+    def _analyze_segment_rows(self, segments: np.ndarray) -> List[Dict[str, Any]]:
+        """Classify non-silent rows of a segment batch; silent rows get a zero-probability result."""
+        active = self._active_segment_mask(segments)
+        segment_results = [{
+            "stutter_detected": False,
+            "stutter_probability": 0.0,
+            "confidence": 0.0,
+            "analysis_method": "silence_skipped"
+        } for _ in range(len(segments))]
+        active_indices = np.flatnonzero(active)
+        if len(active_indices):
+            active_segments = segments if len(active_indices) == len(segments) else segments[active_indices]
+            for i, segment_result in zip(active_indices, self._analyze_segments_batch(active_segments)):
+                segment_results[i] = segment_result
+        return segment_results
+
+    def _ensure_warm(self):
+        """Run one dummy forward pass so first-call setup overlaps with audio decoding."""
+        if self._warm or self.model is None:
+            return
+        try:
+            self._predict_probabilities(np.zeros((1, self.segment_samples), dtype=np.float32))
+        except Exception as e:
+            logger.warning(f"Stutter model warmup failed: {e}")
+        self._warm = True
+
     def _load_audio(self, audio_path: str) -> np.ndarray:
         try:
-            audio, sr = librosa.load(audio_path, sr=self.sample_rate, mono=True)
+            try:
+                waveform, sr = torchaudio.load(audio_path)
+                if waveform.shape[0] > 1:
+                    waveform = waveform.mean(dim=0, keepdim=True)
+                if sr != self.sample_rate:
+                    waveform = torchaudio.functional.resample(waveform, sr, self.sample_rate)
+                audio = waveform.squeeze(0).numpy()
+            except Exception as e:
+                logger.warning(f"torchaudio could not decode {audio_path}, falling back to librosa: {e}")
+                audio, sr = librosa.load(audio_path, sr=self.sample_rate, mono=True)
             audio = librosa.util.normalize(audio)
             return audio
         except Exception as e:
             logger.error(f"Error loading audio: {e}")
             raise
 
-    def _segment_audio(self, audio_data: np.ndarray) -> List[np.ndarray]:
-        segments = []
+    def _segment_audio(self, audio_data: np.ndarray) -> np.ndarray:
+        """Split audio into a zero-padded (n_segments, segment_samples) float32 batch."""
+        audio_data = np.asarray(audio_data, dtype=np.float32)
         total_samples = len(audio_data)
-        for start_sample in range(0, total_samples, self.segment_samples):
-            end_sample = min(start_sample + self.segment_samples, total_samples)
-            segment = audio_data[start_sample:end_sample]
-            if len(segment) < self.segment_samples:
-                padding = np.zeros(self.segment_samples - len(segment))
-                segment = np.concatenate([segment, padding])
-            segments.append(segment)
-        return segments
-
-    def _analyze_segment_with_pipeline(self, segment: np.ndarray) -> Dict[str, Any]:
+        n_segments = (total_samples + self.segment_samples - 1) // self.segment_samples
+        if total_samples == n_segments * self.segment_samples:
+            return audio_data.reshape(n_segments, self.segment_samples)
+        batch = np.zeros((n_segments, self.segment_samples), dtype=np.float32)
+        batch.reshape(-1)[:total_samples] = audio_data
+        return batch
+
+    def _active_segment_mask(self, segments: np.ndarray) -> np.ndarray:
+        """Boolean mask of segments whose RMS is above the silence threshold."""
+        rms = np.sqrt(np.einsum('ij,ij->i', segments, segments, dtype=np.float64) / self.segment_samples)
+        return rms >= SILENCE_RMS_THRESHOLD
+
+    def _analyze_segments_batch(self, segments: np.ndarray) -> List[Dict[str, Any]]:
+        """Classify a (n, segment_samples) batch with one forward pass per MAX_BATCH rows."""
         try:
-            result = self.pipeline(segment, sampling_rate=self.sample_rate)
-            stutter_labels = {"repetition", "prolongation", "blocks", "stutter", "1"}
-            stutter_probs = [pred['score'] for pred in result if pred['label'].lower() in stutter_labels]
-            stutter_probability = max(stutter_probs) if stutter_probs else 0.0
-            stutter_detected = stutter_probability > 0.7
-            return {
-                "stutter_detected": stutter_detected,
-                "stutter_probability": float(stutter_probability),
-                "confidence": float(stutter_probability),
-                "model_output": result,
-                "analysis_method": "huggingface_pipeline"
-            }
+            probs = np.concatenate([
+                self._predict_probabilities(segments[start:start + MAX_BATCH])
+                for start in range(0, len(segments), MAX_BATCH)
+            ])
         except Exception as e:
-            logger.error(f"Error in segment pipeline analysis: {e}")
-            return {
+            logger.error(f"Error in batched segment analysis: {e}")
+            return [{
                 "stutter_detected": False,
                 "stutter_probability": 0.0,
                 "confidence": 0.0,
-                "analysis_method": "pipeline_error"
-            }
+                "analysis_method": "model_error"
+            } for _ in range(len(segments))]
 
-    def _analyze_segment_with_model(self, segment: np.ndarray) -> Dict[str, Any]:
-        try:
-            inputs = self.feature_extractor(segment, sampling_rate=self.sample_rate, return_tensors="pt")
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            probs = predictions.cpu().numpy()[0]
-            stutter_probability = float(probs[1]) if len(probs) >= 2 else float(probs[0])
-            stutter_detected = stutter_probability > 0.8
-            return {
-                "stutter_detected": stutter_detected,
+        stutter_probs = probs[:, self._stutter_columns].max(axis=1)
+        segment_results = []
+        for row, stutter_probability in zip(probs, stutter_probs):
+            stutter_probability = float(stutter_probability)
+            segment_result = {
+                "stutter_detected": stutter_probability > self._detection_threshold,
                 "stutter_probability": stutter_probability,
                 "confidence": stutter_probability,
-                "model_probabilities": probs.tolist(),
-                "analysis_method": "direct_model_inference"
-            }
-        except Exception as e:
-            logger.error(f"Error in segment model analysis: {e}")
-            return {
-                "stutter_detected": False,
-                "stutter_probability": 0.0,
-                "confidence": 0.0,
-                "analysis_method": "model_error"
+                "analysis_method": self._analysis_method
             }
+            if self.verbose:
+                segment_result["model_probabilities"] = row.tolist()
+            segment_results.append(segment_result)
+        return segment_results
+
+    def _predict_probabilities(self, batch: np.ndarray) -> np.ndarray:
+        if self._use_feature_extractor:
+            batch = self.feature_extractor(
+                list(batch), sampling_rate=self.sample_rate, return_tensors="np"
+            )["input_values"].astype(np.float32, copy=False)
+
+        if self._onnx_session is not None:
+            with torch.inference_mode():
+                input_values = self._normalize(torch.from_numpy(batch))
+            logits = self._onnx_session.run(None, {"input_values": input_values.numpy()})[0]
+            return torch.softmax(torch.from_numpy(logits).float(), dim=-1).numpy()
 
-    def _aggregate_segment_results(self, segment_results: List[Dict[str, Any]], audio_data: np.ndarray, audio_path: str) -> Dict[str, Any]:
+        input_values = self._to_device(batch)
+        with torch.inference_mode():
+            input_values = self._normalize(input_values)
+            if self.model.dtype != torch.float32:
+                input_values = input_values.to(self.model.dtype)
+            logits = self.model(input_values=input_values).logits
+            predictions = torch.nn.functional.softmax(logits.float(), dim=-1)
+        probs = predictions.to("cpu", non_blocking=self._copy_stream is not None)
+        if self._copy_stream is not None:
+            torch.cuda.current_stream().synchronize()
+        return probs.numpy()
+
+    def _normalize(self, input_values: torch.Tensor) -> torch.Tensor:
+        """Per-segment zero-mean/unit-variance normalisation, as done by the HuBERT feature extractor."""
+        if not self._do_normalize or self._use_feature_extractor:
+            return input_values
+        var, mean = torch.var_mean(input_values, dim=-1, unbiased=False, keepdim=True)
+        return (input_values - mean) * torch.rsqrt(var + 1e-7)
+
+    def _to_device(self, batch: np.ndarray) -> torch.Tensor:
+        """Move a batch to the device, staging through the pinned host buffer on a side stream on CUDA."""
+        tensor = torch.from_numpy(batch)
+        if self._copy_stream is None:
+            return tensor.to(self.device)
+        host = self._host_buffer[:len(batch)]
+        host.copy_(tensor)
+        with torch.cuda.stream(self._copy_stream):
+            device_tensor = host.to(self.device, non_blocking=True)
+        torch.cuda.current_stream().wait_stream(self._copy_stream)
+        device_tensor.record_stream(torch.cuda.current_stream())
+        return device_tensor
+
+    def _aggregate_segment_results(self, segment_results: List[Dict[str, Any]], total_duration: float, audio_path: str) -> Dict[str, Any]:
         try:
             stutter_segments = [seg for seg in segment_results if seg.get("stutter_detected", False)]
             total_segments = len(segment_results)
             stutter_segments_count = len(stutter_segments)
-            overall_stutter_probability = np.mean([seg.get("stutter_probability", 0.0) for seg in segment_results])
+            probabilities = np.fromiter((seg.get("stutter_probability", 0.0) for seg in segment_results),
+                                        dtype=np.float64, count=total_segments)
+            confidences = np.fromiter((seg.get("confidence", 0.0) for seg in segment_results),
+                                      dtype=np.float64, count=total_segments)
+            overall_stutter_probability = float(probabilities.mean())
             fluency_score = max(0.0, min(10.0, (1.0 - overall_stutter_probability) * 10.0))
             stutter_timeline = sorted([{
                 "start_time": seg["start_time"],
@@ -170,7 +528,7 @@ class StutterDetectionAnalyzer:
                 "segment_id": seg["segment_id"]
             } for seg in stutter_segments], key=lambda x: x["start_time"])
 
-            total_duration_minutes = (len(audio_data) / self.sample_rate) / 60.0
+            total_duration_minutes = total_duration / 60.0
             stutter_frequency = stutter_segments_count / total_duration_minutes if total_duration_minutes > 0 else 0
 
             assessment = self._generate_assessment(overall_stutter_probability, fluency_score)
@@ -181,24 +539,30 @@ class StutterDetectionAnalyzer:
                 "total_segments": total_segments
             })
 
-            return {
+            self._segment_details = segment_results
+            result = {
                 "stutter_detected": stutter_segments_count > 0,
-                "stutter_probability": float(overall_stutter_probability),
-                "confidence": float(np.mean([seg.get("confidence", 0.0) for seg in segment_results])),
-                "fluency_score": float(fluency_score),
-                "overall_score": float(fluency_score),
-                "analysis_method": segment_results[0].get("analysis_method", "unknown"),
+                "stutter_probability": overall_stutter_probability,
+                "confidence": float(confidences.mean()),
+                "fluency_score": fluency_score,
+                "overall_score": fluency_score,
+                "analysis_method": next(
+                    (seg["analysis_method"] for seg in segment_results if seg.get("analysis_method") != "silence_skipped"),
+                    segment_results[0].get("analysis_method", "unknown")
+                ),
                 "total_segments": total_segments,
                 "stutter_segments_count": stutter_segments_count,
                 "stutter_frequency_per_minute": float(stutter_frequency),
                 "stutter_percentage": (stutter_segments_count / total_segments * 100) if total_segments > 0 else 0,
                 "stutter_timeline": stutter_timeline,
-                "all_segments": segment_results,
                 "assessment": assessment,
                 "recommendations": recommendations,
                 "segment_duration": self.segment_duration,
-                "total_audio_duration": float(len(audio_data) / self.sample_rate)
+                "total_audio_duration": float(total_duration)
             }
+            if self.verbose:
+                result["all_segments"] = segment_results
+            return result
         except Exception as e:
             logger.error(f"Error aggregating segment results: {e}")
             return {
@@ -207,34 +571,16 @@ class StutterDetectionAnalyzer:
                 "segments": segment_results
             }
 
+    def get_segment_details(self) -> List[Dict[str, Any]]:
+        """Return the per-segment results of the most recent analysis."""
+        return self._segment_details
+
     def _generate_recommendations(self, analysis_result: Dict[str, Any]) -> List[str]:
-        recommendations = []
         stutter_prob = analysis_result.get("stutter_probability", 0.0)
-        fluency_score = analysis_result.get("fluency_score", 5.0)
         stutter_segments_count = analysis_result.get("stutter_segments_count", 0)
 
-        if stutter_prob > 0.7:
-            recommendations.extend([
-                "Consider working with a speech therapist for targeted stutter reduction techniques.",
-                "Practice slow, deliberate speech with frequent pauses.",
-                "Use breathing exercises to maintain steady speech rhythm.",
-                "Record yourself speaking and identify specific trigger words or situations."
-            ])
-        elif stutter_prob > 0.4:
-            recommendations.extend([
-                "Practice speaking at a slower pace, especially during presentations.",
-                "Use relaxation techniques before speaking engagements.",
-                "Consider joining a speech improvement group or workshop.",
-                "Focus on maintaining steady breathing while speaking."
-            ])
-        elif stutter_prob > 0.2:
-            recommendations.extend([
-                "Continue practicing clear articulation and pacing.",
-                "Consider recording presentations to identify improvement areas.",
-                "Practice speaking in front of a mirror to build confidence."
-            ])
-        else:
-            recommendations.append("Excellent speech fluency! Continue maintaining your current speaking practices.")
+        tier = bisect.bisect_left(self._RECOMMENDATION_THRESHOLDS, stutter_prob)
+        recommendations = list(self._RECOMMENDATIONS[tier])
 
         if stutter_segments_count > 0:
             recommendations.append(f"Focus on the {stutter_segments_count} segments where stuttering was detected.")
@@ -242,16 +588,13 @@ class StutterDetectionAnalyzer:
         return recommendations
 
     def _generate_assessment(self, stutter_prob: float, fluency_score: float) -> str:
-        if fluency_score >= 9.0:
-            return "Excellent speech fluency with minimal stuttering detected."
-        elif fluency_score >= 7.0:
-            return "Good speech fluency with occasional stuttering."
-        elif fluency_score >= 5.0:
-            return "Moderate speech fluency with noticeable stuttering patterns."
-        elif fluency_score >= 3.0:
-            return "Significant stuttering detected, speech therapy recommended."
-        else:
-            return "Severe stuttering detected, professional speech therapy strongly recommended."
+        return self._ASSESSMENTS[bisect.bisect_right(self._ASSESSMENT_THRESHOLDS, fluency_score)]
+
+    def _frame_audio(self, audio_data: np.ndarray, frame_length: int = 2048, hop_length: int = 512,
+                     pad_mode: str = "constant") -> np.ndarray:
+        """Zero-copy centered framing, equivalent to librosa's default frame layout."""
+        padded = np.pad(audio_data, frame_length // 2, mode=pad_mode)
+        return np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop_length]
 
     def _fallback_analysis(self, audio_data: np.ndarray, audio_path: str) -> Dict[str, Any]:
         """
@@ -260,11 +603,11 @@ class StutterDetectionAnalyzer:
         """
         try:
             duration = len(audio_data) / self.sample_rate
-            zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
+            frames = self._frame_audio(audio_data)
+            signs = np.signbit(frames)
+            zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
             zcr_mean = float(np.mean(zcr))
-            energy = np.sum(audio_data ** 2)
-            energy_var = np.std(audio_data ** 2)
-            rms = librosa.feature.rms(y=audio_data)[0]
+            rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frames.shape[1])
             rms_var = float(np.std(rms))
             
             # Heuristic scoring: higher ZCR and energy variance indicate possible stuttering
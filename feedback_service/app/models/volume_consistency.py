@@ -1,11 +1,199 @@
-import librosa
+import math
 import numpy as np
-import pyloudnorm as pyln
+import soundfile as sf
+import librosa
 import logging
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from numba import njit, prange
+from scipy.signal import resample_poly, sosfilt
+from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# RMS and loudness are independent and run in GIL-free native code, so they overlap
+_analysis_pool = ThreadPoolExecutor(max_workers=2)
+
+# Below this length there are too few 1 s loudness blocks for a meaningful spread, so RMS alone is used
+MIN_LOUDNESS_SECONDS = 3.0
+
+
+@njit(cache=True, fastmath=True, nogil=True, parallel=True)
+def _rms_db_stats(y, frame_length, hop_length, amin, top_db):
+    """
+    Framewise RMS in dB relative to the loudest frame, reduced to (mean, std, min, max).
+    Matches librosa.feature.rms(center=True) followed by amplitude_to_db(ref=np.max) without
+    materialising the frame matrix. Frames are independent, so both passes run across cores.
+    """
+    n = y.shape[0]
+    pad = frame_length // 2
+    n_frames = 1 + (n + 2 * pad - frame_length) // hop_length
+    if n_frames <= 0:
+        raise ValueError("Audio is too short for RMS framing")
+    power = np.empty(n_frames)
+    for i in prange(n_frames):
+        start = i * hop_length - pad
+        lo = max(start, 0)
+        hi = min(start + frame_length, n)
+        s = 0.0
+        for j in range(lo, hi):
+            s += y[j] * y[j]
+        power[i] = s / frame_length
+    max_power = power.max()
+    min_power = power.min()
+    # max(10*log10(max(amin**2, p)) - ref_db, -top_db) == 10*log10(max(p, floor)) - ref_db,
+    # so the amin and top_db clamps collapse into one power floor and one log per frame
+    ref_power = max(amin * amin, max_power)
+    ref_db = 10.0 * np.log10(ref_power)
+    floor = max(amin * amin, ref_power * 10.0 ** (-top_db / 10.0))
+    total = 0.0
+    total_sq = 0.0
+    for i in prange(n_frames):
+        lp = np.log10(max(power[i], floor))
+        total += lp
+        total_sq += lp * lp
+    mean_lp = total / n_frames
+    mean = 10.0 * mean_lp - ref_db
+    std = 10.0 * np.sqrt(max(total_sq / n_frames - mean_lp * mean_lp, 0.0))
+    mn = 10.0 * np.log10(max(min_power, floor)) - ref_db
+    mx = 10.0 * np.log10(max(max_power, floor)) - ref_db
+    return mean, std, mn, mx
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _stats4(a):
+    """(mean, std, min, max) of a non-empty 1-D array in a single pass."""
+    n = a.shape[0]
+    total = 0.0
+    total_sq = 0.0
+    mn = a[0]
+    mx = a[0]
+    for i in range(n):
+        v = a[i]
+        total += v
+        total_sq += v * v
+        if v < mn:
+            mn = v
+        if v > mx:
+            mx = v
+    mean = total / n
+    std = np.sqrt(max(total_sq / n - mean * mean, 0.0))
+    return mean, std, mn, mx
+
+
+# No fastmath here: it lets the compiler assume values are finite and drop the check
+@njit(cache=True, nogil=True)
+def _compact_finite(a):
+    """Move the finite values of `a` to its front in place, in order, and return how many there are."""
+    w = 0
+    for i in range(a.shape[0]):
+        v = a[i]
+        if np.isfinite(v):
+            a[w] = v
+            w += 1
+    return w
+
+
+def _cumulative_power(x: np.ndarray) -> np.ndarray:
+    """Running sum of squares with a leading zero, written into one preallocated float64 buffer."""
+    cumulative = np.empty(len(x) + 1, dtype=np.float64)
+    cumulative[0] = 0.0
+    # Squares stay float32; only the running sum needs float64 headroom
+    np.cumsum(x * x, dtype=np.float64, out=cumulative[1:])
+    return cumulative
+
+
+def _block_means(cumulative: np.ndarray, n_samples: int, block: int, step: int) -> np.ndarray:
+    """
+    Mean of every full block of `block` samples taken every `step` samples, from a _cumulative_power buffer.
+    A 2-D buffer (one cumulative row per signal) gives one row of block means per signal.
+    """
+    starts = np.arange(0, n_samples - block + 1, step)
+    return (cumulative[..., starts + block] - cumulative[..., starts]) / block
+
+
+def _k_weighting_sos(rate: int) -> np.ndarray:
+    """ITU-R BS.1770 K-weighting (high shelf + high pass) as second-order sections, designed like pyloudnorm."""
+    sections = []
+    for kind, gain, q, fc in (("high_shelf", 4.0, 1 / np.sqrt(2), 1500.0), ("high_pass", 0.0, 0.5, 38.0)):
+        a_lin = 10 ** (gain / 40.0)
+        w0 = 2.0 * np.pi * fc / rate
+        alpha = np.sin(w0) / (2.0 * q)
+        cos_w0 = np.cos(w0)
+        if kind == "high_shelf":
+            b = [a_lin * ((a_lin + 1) + (a_lin - 1) * cos_w0 + 2 * np.sqrt(a_lin) * alpha),
+                 -2 * a_lin * ((a_lin - 1) + (a_lin + 1) * cos_w0),
+                 a_lin * ((a_lin + 1) + (a_lin - 1) * cos_w0 - 2 * np.sqrt(a_lin) * alpha)]
+            a = [(a_lin + 1) - (a_lin - 1) * cos_w0 + 2 * np.sqrt(a_lin) * alpha,
+                 2 * ((a_lin - 1) - (a_lin + 1) * cos_w0),
+                 (a_lin + 1) - (a_lin - 1) * cos_w0 - 2 * np.sqrt(a_lin) * alpha]
+        else:
+            b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+            a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+        sections.append(np.concatenate([b, a]) / a[0])
+    return np.array(sections)
+
+
+def _gated_loudness(z: np.ndarray) -> np.ndarray:
+    """BS.1770 gated loudness (LUFS) over the last axis of gating-block mean squares."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        block_lufs = -0.691 + 10.0 * np.log10(z)
+        above_absolute = block_lufs >= -70.0
+        relative_gate = -0.691 + 10.0 * np.log10(
+            np.sum(z * above_absolute, axis=-1) / np.sum(above_absolute, axis=-1)
+        ) - 10.0
+        gated = above_absolute & (block_lufs > relative_gate[..., None])
+        mean_power = np.nan_to_num(np.sum(z * gated, axis=-1) / np.sum(gated, axis=-1))
+        return -0.691 + 10.0 * np.log10(mean_power)
+
+@dataclass(frozen=True, slots=True)
+class RmsStats:
+    """Framewise RMS level statistics in dB relative to the loudest frame."""
+    mean: float
+    std: float
+    min: float
+    max: float
+
+    @property
+    def dynamic_range(self) -> float:
+        return self.max - self.min
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mean_rms_db": self.mean,
+            "std_rms_db": self.std,
+            "min_rms_db": self.min,
+            "max_rms_db": self.max,
+            "dynamic_range_db": self.dynamic_range
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class LoudnessStats:
+    """Loudness of 1 second blocks (LUFS, or a rough power estimate for the fallback)."""
+    integrated: Optional[float]
+    mean: float
+    std: float
+    min: float
+    max: float
+    blocks: List[float] = field(repr=False)
+    method: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "integrated_loudness_lufs": self.integrated,
+            "block_loudness": self.blocks,
+            "mean_loudness": self.mean,
+            "std_loudness": self.std,
+            "min_loudness": self.min,
+            "max_loudness": self.max,
+            "loudness_range": self.max - self.min
+        }
+        if self.method:
+            result["method"] = self.method
+        return result
+
+
 class VolumeConsistencyAnalyzer:
     """
     Volume Consistency Analysis using audio processing libraries.
@@ -19,161 +207,274 @@ class VolumeConsistencyAnalyzer:
         self.min_loudness = -40.0
         self.max_loudness = -6.0
         self.target_loudness = -23.0  # EBU R128 / broadcast standard (LUFS)
+        # K-weighting filters keyed by sample rate; designing them per request is wasted work
+        self._k_weighting: Dict[int, np.ndarray] = {
+            self.sample_rate: _k_weighting_sos(self.sample_rate).astype(np.float32)
+        }
+        self._warmup()
+
+    def _warmup(self):
+        """Compile (or load from cache) the numba kernels now so the first request runs at steady-state speed."""
+        try:
+            _rms_db_stats(np.zeros(self.sample_rate, dtype=np.float32), self.frame_length, self.hop_length, 1e-5, 80.0)
+            _stats4(np.zeros(1, dtype=np.float64))
+            _compact_finite(np.zeros(1, dtype=np.float64))
+        except Exception as e:
+            logger.warning(f"Volume kernel warmup failed: {e}")
 
     def analyze(self, audio_path: str) -> Dict[str, Any]:
         """
         Analyze volume consistency and dynamics.
         Returns a dictionary with consistency score (0-10), quality score (0-10), and recommendations.
         """
-        logger.info(f"Starting Volume Consistency Analysis for {audio_path}")
+        logger.debug("Starting Volume Consistency Analysis for %s", audio_path)
         try:
-            y, sr = librosa.load(audio_path, sr=self.sample_rate)
-            rms_analysis = self._analyze_rms_energy(y)
-            loudness_analysis = self._analyze_loudness(y, sr)
-            variation_analysis = self._analyze_volume_variation(rms_analysis, loudness_analysis)
-            issues = self._detect_volume_issues(rms_analysis, loudness_analysis)
-            assessment = self._generate_assessment(variation_analysis, issues)
-            recommendations = self._generate_recommendations(variation_analysis, issues)
-            consistency_score = variation_analysis.get("overall_consistency_score", 5.0)
-            volume_quality_score = assessment.get("volume_quality_score", 5.0)
-            return {
-                "rms_analysis": rms_analysis,
-                "loudness_analysis": loudness_analysis,
-                "variation_analysis": variation_analysis,
-                "detected_issues": issues,
-                "assessment": assessment,
-                "recommendations": recommendations,
-                "consistency_score": float(consistency_score),
-                "overall_score": float(volume_quality_score),
-                "volume_quality_score": float(volume_quality_score)
-            }
+            y, sr = self._load_audio(audio_path)
+            if len(y) < MIN_LOUDNESS_SECONDS * sr:
+                return self._build_result(self._analyze_rms_energy(y), None, loudness_skipped=True)
+            loudness_future = _analysis_pool.submit(self._analyze_loudness, y, sr)
+            rms_stats = self._analyze_rms_energy(y)
+            return self._build_result(rms_stats, loudness_future.result())
         except Exception as e:
             logger.error(f"Error in volume consistency analysis: {e}")
-            return {
-                "error": str(e),
-                "volume_analysis": {},
-                "consistency_score": 5.0,
-                "overall_score": 5.0,
-                "volume_quality_score": 5.0
-            }
+            return self._error_result(e)
+
+    def analyze_batch(self, audio_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze several files at once. Clips are loaded concurrently and K-weighted together as one
+        zero-padded (clips, samples) buffer, and all their 1 second blocks in one more filter call.
+        Returns one analyze()-style result per path, in order.
+        """
+        logger.debug("Starting Volume Consistency Analysis for %d files", len(audio_paths))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(audio_paths)
+        signals: Dict[int, np.ndarray] = {}
+        load_futures = [_analysis_pool.submit(self._load_audio, path) for path in audio_paths]
+        for i, future in enumerate(load_futures):
+            try:
+                signals[i] = future.result()[0]
+            except Exception as e:
+                logger.error(f"Error in volume consistency analysis for {audio_paths[i]}: {e}")
+                results[i] = self._error_result(e)
+        min_samples = MIN_LOUDNESS_SECONDS * self.sample_rate
+        measured = [i for i, y in signals.items() if len(y) >= min_samples]
+        try:
+            measured_signals = [signals[i] for i in measured]
+            gating_powers = list(zip(self._batch_gating_block_powers(measured_signals, self.sample_rate),
+                                     self._second_block_powers(measured_signals, self.sample_rate)))
+        except Exception as e:
+            logger.warning(f"Batched loudness analysis failed, analyzing files individually: {e}")
+            gating_powers = [(None, None)] * len(measured)
+        gating_by_index = dict(zip(measured, gating_powers))
+        for i, y in signals.items():
+            try:
+                if i not in gating_by_index:
+                    results[i] = self._build_result(self._analyze_rms_energy(y), None, loudness_skipped=True)
+                    continue
+                z, block_z = gating_by_index[i]
+                if z is None:
+                    loudness_stats = self._analyze_loudness(y, self.sample_rate)
+                else:
+                    loudness_stats = (self._loudness_from_gating(z, block_z)
+                                      or self._fallback_loudness_analysis(y))
+                results[i] = self._build_result(self._analyze_rms_energy(y), loudness_stats)
+            except Exception as e:
+                logger.error(f"Error in volume consistency analysis for {audio_paths[i]}: {e}")
+                results[i] = self._error_result(e)
+        return results
+
+    def _build_result(self, rms_stats: Optional[RmsStats], loudness_stats: Optional[LoudnessStats],
+                      loudness_skipped: bool = False) -> Dict[str, Any]:
+        variation_analysis = self._analyze_volume_variation(rms_stats, loudness_stats)
+        issues = self._detect_volume_issues(rms_stats, loudness_stats)
+        assessment = self._generate_assessment(variation_analysis, issues)
+        recommendations = self._generate_recommendations(variation_analysis, issues)
+        consistency_score = variation_analysis.get("overall_consistency_score", 5.0)
+        volume_quality_score = assessment.get("volume_quality_score", 5.0)
+        return {
+            "rms_analysis": rms_stats.to_dict() if rms_stats else {},
+            "loudness_analysis": (loudness_stats.to_dict() if loudness_stats
+                                  else {"integrated_loudness_lufs": None, "method": "too_short"} if loudness_skipped
+                                  else {"error": "Could not calculate loudness"}),
+            "variation_analysis": variation_analysis,
+            "detected_issues": issues,
+            "assessment": assessment,
+            "recommendations": recommendations,
+            "consistency_score": float(consistency_score),
+            "overall_score": float(volume_quality_score),
+            "volume_quality_score": float(volume_quality_score)
+        }
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        return {
+            "error": str(error),
+            "volume_analysis": {},
+            "consistency_score": 5.0,
+            "overall_score": 5.0,
+            "volume_quality_score": 5.0
+        }
 
-    def _analyze_rms_energy(self, y: np.ndarray) -> Dict[str, Any]:
+    def _load_audio(self, audio_path: str):
         try:
-            rms = librosa.feature.rms(
-                y=y,
-                frame_length=self.frame_length,
-                hop_length=self.hop_length
-            )[0]
-            rms_db = librosa.amplitude_to_db(rms, ref=np.max)
-            mean_rms = float(np.mean(rms_db))
-            std_rms = float(np.std(rms_db))
-            min_rms = float(np.min(rms_db))
-            max_rms = float(np.max(rms_db))
-            dynamic_range = max_rms - min_rms
-            return {
-                "mean_rms_db": mean_rms,
-                "std_rms_db": std_rms,
-                "min_rms_db": min_rms,
-                "max_rms_db": max_rms,
-                "dynamic_range_db": float(dynamic_range)
-            }
+            y, file_sr = sf.read(audio_path, dtype="float32")
+        except RuntimeError as e:
+            # Formats libsndfile cannot read (m4a/aac/opus uploads, video without ffmpeg) go through librosa/audioread
+            logger.warning(f"soundfile could not decode {audio_path}, falling back to librosa: {e}")
+            y, _ = librosa.load(audio_path, sr=self.sample_rate, mono=True)
+            return np.ascontiguousarray(y, dtype=np.float32), self.sample_rate
+        if y.ndim == 2:
+            y = y.mean(axis=1, dtype=np.float32)
+        if file_sr != self.sample_rate:
+            g = math.gcd(file_sr, self.sample_rate)
+            y = resample_poly(y, self.sample_rate // g, file_sr // g).astype(np.float32, copy=False)
+        return np.ascontiguousarray(y, dtype=np.float32), self.sample_rate
+
+    def _analyze_rms_energy(self, y: np.ndarray, stats_only: bool = True) -> Optional[RmsStats]:
+        """
+        RMS level statistics. Only the aggregates are reported, so by default frames do not overlap
+        (hop = frame length), which visits each sample once instead of ~2.5 times.
+        """
+        try:
+            hop_length = self.frame_length if stats_only else self.hop_length
+            mean_rms, std_rms, min_rms, max_rms = _rms_db_stats(y, self.frame_length, hop_length, 1e-5, 80.0)
+            return RmsStats(float(mean_rms), float(std_rms), float(min_rms), float(max_rms))
         except Exception as e:
             logger.error(f"Error analyzing RMS energy: {e}")
-            return {}
+            return None
 
-    def _analyze_loudness(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
+    def _analyze_loudness(self, y: np.ndarray, sr: int) -> Optional[LoudnessStats]:
         try:
             try:
-                meter = pyln.Meter(sr)
-                loudness = meter.integrated_loudness(y)
-                block_size = sr  # 1 second blocks
-                block_loudness = []
-                for i in range(0, len(y) - block_size, block_size // 2):
-                    block = y[i:i + block_size]
-                    if len(block) == block_size:
-                        block_lufs = meter.integrated_loudness(block)
-                        block_loudness.append(block_lufs)
-                if block_loudness:
-                    block_loudness = np.array(block_loudness)
-                    block_loudness = block_loudness[np.isfinite(block_loudness)]
-                    if len(block_loudness) > 0:
-                        return {
-                            "integrated_loudness_lufs": float(loudness) if np.isfinite(loudness) else None,
-                            "block_loudness": block_loudness.tolist(),
-                            "mean_loudness": float(np.mean(block_loudness)),
-                            "std_loudness": float(np.std(block_loudness)),
-                            "min_loudness": float(np.min(block_loudness)),
-                            "max_loudness": float(np.max(block_loudness)),
-                            "loudness_range": float(np.max(block_loudness) - np.min(block_loudness))
-                        }
+                loudness_stats = self._loudness_from_gating(self._gating_block_powers(y, sr),
+                                                            self._second_block_powers([y], sr)[0])
+                if loudness_stats:
+                    return loudness_stats
             except Exception as e:
-                logger.warning(f"pyloudnorm analysis failed: {e}")
+                logger.warning(f"BS.1770 loudness analysis failed: {e}")
             return self._fallback_loudness_analysis(y)
         except Exception as e:
             logger.error(f"Error analyzing loudness: {e}")
-            return {}
+            return None
+
+    def _loudness_from_gating(self, z: np.ndarray, block_z: np.ndarray) -> Optional[LoudnessStats]:
+        """
+        Integrated loudness from the whole clip's gating-block powers and 1 second block loudness from
+        _second_block_powers; None if no block is finite.
+        """
+        loudness = float(_gated_loudness(z))
+        if len(block_z) == 0:
+            return None
+        block_loudness = _gated_loudness(block_z)
+        block_loudness = block_loudness[:_compact_finite(block_loudness)]
+        if len(block_loudness) == 0:
+            return None
+        mean_l, std_l, min_l, max_l = _stats4(block_loudness)
+        return LoudnessStats(
+            integrated=loudness if np.isfinite(loudness) else None,
+            mean=float(mean_l),
+            std=float(std_l),
+            min=float(min_l),
+            max=float(max_l),
+            blocks=block_loudness.tolist()
+        )
 
-    def _fallback_loudness_analysis(self, y: np.ndarray) -> Dict[str, Any]:
+    def _k_weighting_for(self, sr: int) -> np.ndarray:
+        sos = self._k_weighting.get(sr)
+        if sos is None:
+            sos = self._k_weighting.setdefault(sr, _k_weighting_sos(sr).astype(np.float32))
+        return sos
+
+    def _gating_block_powers(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """Mean square of the K-weighted signal over 400 ms gating blocks with a 100 ms step."""
+        gate = int(0.4 * sr)
+        if len(y) < gate:
+            raise ValueError("Audio must be longer than the 400 ms gating block")
+        weighted = sosfilt(self._k_weighting_for(sr), y.astype(np.float32, copy=False))
+        return _block_means(_cumulative_power(weighted), len(weighted), gate, sr // 10)
+
+    def _second_block_powers(self, signals: List[np.ndarray], sr: int) -> List[np.ndarray]:
+        """
+        Gating-block powers of every 1 second block (50% overlap) of each clip, shape (blocks, 7).
+        Each block is K-weighted on its own from zero filter state, as pyloudnorm measures a block;
+        carrying the filter state over from the previous block shifts quiet blocks by up to ~2 LU.
+        All blocks of all clips go through one filter call.
+        """
+        gate = int(0.4 * sr)
+        counts = [len(range(0, len(y) - sr, sr // 2)) for y in signals]
+        views = [np.lib.stride_tricks.sliding_window_view(y.astype(np.float32, copy=False), sr)[::sr // 2][:n]
+                 for y, n in zip(signals, counts) if n > 0]
+        if not views:
+            return [np.empty((0, 7)) for _ in signals]
+        weighted = sosfilt(self._k_weighting_for(sr), np.concatenate(views), axis=1)
+        cumulative = np.empty((len(weighted), sr + 1), dtype=np.float64)
+        cumulative[:, 0] = 0.0
+        np.cumsum(weighted * weighted, axis=1, dtype=np.float64, out=cumulative[:, 1:])
+        powers = _block_means(cumulative, sr, gate, sr // 10)
+        return np.split(powers, np.cumsum(counts)[:-1])
+
+    def _batch_gating_block_powers(self, signals: List[np.ndarray], sr: int) -> List[Optional[np.ndarray]]:
+        """_gating_block_powers for several clips with one filter pass; None for clips shorter than a gating block."""
+        if not signals:
+            return []
+        gate = int(0.4 * sr)
+        lengths = [len(y) for y in signals]
+        batch = np.zeros((len(signals), max(lengths)), dtype=np.float32)
+        for row, y in zip(batch, signals):
+            row[:len(y)] = y
+        # The filter is causal, so the zero padding never leaks into a clip's own samples
+        weighted = sosfilt(self._k_weighting_for(sr), batch, axis=1)
+        cumulative = np.empty((len(signals), batch.shape[1] + 1), dtype=np.float64)
+        cumulative[:, 0] = 0.0
+        np.cumsum(weighted * weighted, axis=1, dtype=np.float64, out=cumulative[:, 1:])
+        return [_block_means(c, n, gate, sr // 10) if n >= gate else None for c, n in zip(cumulative, lengths)]
+
+    def _fallback_loudness_analysis(self, y: np.ndarray) -> Optional[LoudnessStats]:
         try:
             window_size = self.sample_rate  # 1 second windows
             hop_size = window_size // 2
-            power_values = []
-            for i in range(0, len(y) - window_size, hop_size):
-                window = y[i:i + window_size]
-                power = np.mean(window ** 2)
-                if power > 0:
-                    pseudo_lufs = 10 * np.log10(power) - 10  # Rough calibration
-                    power_values.append(pseudo_lufs)
-            if not power_values:
-                return {"error": "Could not calculate loudness"}
-            power_values = np.array(power_values)
-            return {
-                "integrated_loudness_lufs": float(np.mean(power_values)),
-                "block_loudness": power_values.tolist(),
-                "mean_loudness": float(np.mean(power_values)),
-                "std_loudness": float(np.std(power_values)),
-                "min_loudness": float(np.min(power_values)),
-                "max_loudness": float(np.max(power_values)),
-                "loudness_range": float(np.max(power_values) - np.min(power_values)),
-                "method": "fallback_estimation"
-            }
+            if len(y) <= window_size:
+                return None
+            cumulative = _cumulative_power(y.astype(np.float32, copy=False))
+            starts = np.arange(0, len(y) - window_size, hop_size)
+            power = (cumulative[starts + window_size] - cumulative[starts]) / window_size
+            power = power[power > 0]
+            if len(power) == 0:
+                return None
+            power_values = 10 * np.log10(power) - 10  # Rough calibration
+            mean_p, std_p, min_p, max_p = _stats4(power_values)
+            return LoudnessStats(
+                integrated=float(mean_p),
+                mean=float(mean_p),
+                std=float(std_p),
+                min=float(min_p),
+                max=float(max_p),
+                blocks=power_values.tolist(),
+                method="fallback_estimation"
+            )
         except Exception as e:
             logger.error(f"Error in fallback loudness analysis: {e}")
-            return {"error": str(e)}
+            return None
 
-    def _analyze_volume_variation(self, rms_analysis: Dict, loudness_analysis: Dict) -> Dict[str, Any]:
+    def _analyze_volume_variation(self, rms: Optional[RmsStats], loudness: Optional[LoudnessStats]) -> Dict[str, Any]:
         try:
             variation_metrics = {}
-            if rms_analysis:
-                std_rms = rms_analysis.get("std_rms_db", 0)
-                dynamic_range = rms_analysis.get("dynamic_range_db", 0)
-                mean_rms = rms_analysis.get("mean_rms_db", -20)
-                cv_rms = abs(std_rms / mean_rms) if mean_rms != 0 else 1.0
+            # Research-based scoring: high consistency = 10, low = 4 or below.
+            # Each measure costs 0 (high), 1 (medium) or 3 (low) points.
+            consistency_score = 10
+            if rms:
+                cv_rms = abs(rms.std / rms.mean) if rms.mean != 0 else 1.0
                 variation_metrics.update({
                     "rms_coefficient_of_variation": float(cv_rms),
-                    "rms_dynamic_range": float(dynamic_range),
-                    "rms_consistency": "high" if std_rms < 3 else "medium" if std_rms < 6 else "low"
+                    "rms_dynamic_range": float(rms.dynamic_range),
+                    "rms_consistency": "high" if rms.std < 3 else "medium" if rms.std < 6 else "low"
                 })
-            if loudness_analysis and "std_loudness" in loudness_analysis:
-                std_loudness = loudness_analysis.get("std_loudness", 0)
-                loudness_range = loudness_analysis.get("loudness_range", 0)
+                consistency_score -= (rms.std >= 3) + 2 * (rms.std >= 6)
+            if loudness:
                 variation_metrics.update({
-                    "loudness_standard_deviation": float(std_loudness),
-                    "loudness_range_lufs": float(loudness_range),
-                    "loudness_consistency": "high" if std_loudness < 2 else "medium" if std_loudness < 4 else "low"
+                    "loudness_standard_deviation": float(loudness.std),
+                    "loudness_range_lufs": float(loudness.max - loudness.min),
+                    "loudness_consistency": "high" if loudness.std < 2 else "medium" if loudness.std < 4 else "low"
                 })
-            # Research-based scoring: high consistency = 10, low = 4 or below
-            consistency_score = 10
-            if "rms_consistency" in variation_metrics:
-                if variation_metrics["rms_consistency"] == "low":
-                    consistency_score -= 3
-                elif variation_metrics["rms_consistency"] == "medium":
-                    consistency_score -= 1
-            if "loudness_consistency" in variation_metrics:
-                if variation_metrics["loudness_consistency"] == "low":
-                    consistency_score -= 3
-                elif variation_metrics["loudness_consistency"] == "medium":
-                    consistency_score -= 1
+                consistency_score -= (loudness.std >= 2) + 2 * (loudness.std >= 4)
             consistency_score = max(0, consistency_score)
             variation_metrics.update({
                 "overall_consistency_score": float(consistency_score),
@@ -186,53 +487,45 @@ class VolumeConsistencyAnalyzer:
             logger.error(f"Error analyzing volume variation: {e}")
             return {"overall_consistency_score": 5.0, "consistency_level": "unknown"}
 
-    def _detect_volume_issues(self, rms_analysis: Dict, loudness_analysis: Dict) -> List[Dict[str, Any]]:
+    def _detect_volume_issues(self, rms: Optional[RmsStats], loudness: Optional[LoudnessStats]) -> List[Dict[str, Any]]:
         issues = []
         try:
-            if rms_analysis:
-                max_rms = rms_analysis.get("max_rms_db", -100)
-                if max_rms > -1:
-                    issues.append({
-                        "type": "potential_clipping",
-                        "severity": "high",
-                        "description": "Audio may be clipping (too loud)",
-                        "value": max_rms
-                    })
-            if loudness_analysis:
-                mean_loudness = loudness_analysis.get("mean_loudness", -50)
-                if mean_loudness < -35:
+            if rms and rms.max > -1:
+                issues.append({
+                    "type": "potential_clipping",
+                    "severity": "high",
+                    "description": "Audio may be clipping (too loud)",
+                    "value": rms.max
+                })
+            if loudness and loudness.mean < -35:
+                issues.append({
+                    "type": "low_volume",
+                    "severity": "medium",
+                    "description": "Overall volume is quite low",
+                    "value": loudness.mean
+                })
+            if rms and rms.std > 8:
+                issues.append({
+                    "type": "high_variation",
+                    "severity": "medium",
+                    "description": "Volume varies significantly throughout",
+                    "value": rms.std
+                })
+            if loudness and loudness.integrated is not None:
+                if loudness.integrated < -30:
                     issues.append({
-                        "type": "low_volume",
-                        "severity": "medium",
-                        "description": "Overall volume is quite low",
-                        "value": mean_loudness
+                        "type": "below_broadcast_standard",
+                        "severity": "low",
+                        "description": "Volume below broadcast standards",
+                        "value": loudness.integrated
                     })
-            if rms_analysis:
-                std_rms = rms_analysis.get("std_rms_db", 0)
-                if std_rms > 8:
+                elif loudness.integrated > -16:
                     issues.append({
-                        "type": "high_variation",
+                        "type": "above_broadcast_standard",
                         "severity": "medium",
-                        "description": "Volume varies significantly throughout",
-                        "value": std_rms
+                        "description": "Volume above recommended broadcast standards",
+                        "value": loudness.integrated
                     })
-            if loudness_analysis:
-                integrated_loudness = loudness_analysis.get("integrated_loudness_lufs")
-                if integrated_loudness is not None:
-                    if integrated_loudness < -30:
-                        issues.append({
-                            "type": "below_broadcast_standard",
-                            "severity": "low",
-                            "description": "Volume below broadcast standards",
-                            "value": integrated_loudness
-                        })
-                    elif integrated_loudness > -16:
-                        issues.append({
-                            "type": "above_broadcast_standard",
-                            "severity": "medium",
-                            "description": "Volume above recommended broadcast standards",
-                            "value": integrated_loudness
-                        })
             return issues
         except Exception as e:
             logger.error(f"Error detecting volume issues: {e}")
@@ -242,8 +535,12 @@ class VolumeConsistencyAnalyzer:
         try:
             consistency_score = variation_analysis.get("overall_consistency_score", 5)
             consistency_level = variation_analysis.get("consistency_level", "unknown")
-            high_severity_issues = len([i for i in issues if i.get("severity") == "high"])
-            medium_severity_issues = len([i for i in issues if i.get("severity") == "medium"])
+            high_severity_issues = 0
+            medium_severity_issues = 0
+            for issue in issues:
+                severity = issue.get("severity")
+                high_severity_issues += severity == "high"
+                medium_severity_issues += severity == "medium"
             quality_score = consistency_score
             quality_score -= high_severity_issues * 3
             quality_score -= medium_severity_issues * 1
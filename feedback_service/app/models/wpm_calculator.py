@@ -1,11 +1,66 @@
+import asyncio
+import bisect
 import numpy as np
 import librosa
+import soundfile as sf
 import re
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from numba import njit
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Whisper's input rate, so one decoded buffer can serve both WPM analysis and transcription
+SAMPLE_RATE = 16000
+
+# A maximal \w run is already delimited by word boundaries, so this matches exactly what r'\b\w+\b' did
+_WORD_RE = re.compile(r"\w+")
+
+# Pace consistency score -> status, as a bisect lookup table
+_CONSISTENCY_THRESHOLDS = (0.4, 0.6, 0.8)
+_CONSISTENCY_STATUSES = ('poor', 'fair', 'good', 'excellent')
+
+# Assessment status -> wording in "Speaking pace is ... for <context>"
+_ASSESSMENT_WORDING = {
+    'too_slow': 'too slow',
+    'too_fast': 'too fast',
+    'excellent': 'excellent',
+    'good': 'good',
+    'acceptable': 'acceptable'
+}
+
+# Only this many segments are returned in detailed_segments; the rest contribute to summary stats only
+MAX_DETAILED_SEGMENTS = 10
+
+
+@njit(cache=True, nogil=True)
+def _speech_run_bounds(energy, threshold, min_frames):
+    """
+    Fused threshold test and run detection over the frame energies, without the boolean mask,
+    edge array and index arrays the NumPy formulation allocates.
+    Returns (start_frame, end_frame) rows for runs above threshold longer than min_frames.
+    """
+    n_frames = energy.shape[0]
+    bounds = np.empty((n_frames // 2 + 1, 2), dtype=np.int64)
+    n_runs = 0
+    start = -1
+    for i in range(n_frames + 1):
+        speech = i < n_frames and energy[i] > threshold
+        if speech and start < 0:
+            start = i
+        elif not speech and start >= 0:
+            if i - start > min_frames:
+                bounds[n_runs, 0] = start
+                bounds[n_runs, 1] = i
+                n_runs += 1
+            start = -1
+    return bounds[:n_runs]
+
+
+# Runs transcription (network/model bound) while analyze() decodes on the calling thread
+_transcription_pool = ThreadPoolExecutor(max_workers=2)
+
 class WPMCalculator:
     """
     Words Per Minute (WPM) calculator for speech analysis.
@@ -20,22 +75,68 @@ class WPMCalculator:
             'conversation': {'min': 140, 'max': 180, 'optimal': 160},
             'audiobook': {'min': 150, 'max': 200, 'optimal': 175}
         }
+        # context -> (min, max, optimal, range label, target label), derived once from wpm_ranges
+        self._context_table = {
+            context: (v['min'], v['max'], v['optimal'], f"{v['min']}-{v['max']} WPM", f"{v['optimal']} WPM")
+            for context, v in self.wpm_ranges.items()
+        }
+        # (context, status) -> assessment message, so known contexts need no formatting per call
+        self._assessment_messages = {
+            (context, status): f"Speaking pace is {wording} for {context}"
+            for context in self.wpm_ranges
+            for status, wording in _ASSESSMENT_WORDING.items()
+        }
+        self._warmup()
+
+    def _warmup(self):
+        """Compile (or load from cache) the numba kernel now so the first request runs at steady-state speed."""
+        try:
+            _speech_run_bounds(np.zeros(1, dtype=np.float32), np.float32(0.0), 10)
+        except Exception as e:
+            logger.warning(f"WPM kernel warmup failed: {e}")
 
-    def analyze(self, audio_path: str, language: str, context: str = 'presentation', transcript: str = None) -> Dict[str, Any]:
+    def analyze(self, audio_path: str, language: str, context: str = 'presentation', transcript: str = None,
+                audio_data: Optional[np.ndarray] = None,
+                transcript_segments: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """
+        audio_data, if given, is the already decoded clip at SAMPLE_RATE (see load_audio) and skips decoding.
+        With transcript=None, one is fetched from the transcription services while the audio is decoded;
+        that fetch blocks, so it is skipped when called on a running event loop (use run_in_executor).
+        An empty transcript means transcription was already attempted and is reported as missing.
+        transcript_segments, if given, are the transcriber's timed segments ({'start', 'end', 'text'}) for
+        transcript; they give each segment its real word count for the per-segment pace. Pauses always come
+        from the energy VAD, since transcriber segments abut and hide the pauses inside them.
+        """
         logger.info(f"Starting WPM Calculator Analysis for {audio_path}")
+        transcript_future = None
+        if transcript is None and (self.transcription_service_english or self.transcription_service_arabic):
+            try:
+                asyncio.get_running_loop()
+                logger.warning("WPM analyze called on the event loop without a transcript; skipping transcription")
+            except RuntimeError:
+                transcript_future = _transcription_pool.submit(
+                    asyncio.run, self._get_transcription(audio_path, language, audio_data=audio_data)
+                )
         try:
-            audio_data, sample_rate = librosa.load(audio_path, sr=16000)
+            if audio_data is None:
+                audio_data = self._decode(audio_path)
+            sample_rate = SAMPLE_RATE
             duration = len(audio_data) / sample_rate
+            speech_segments = self._detect_speech_segments(audio_data, sample_rate)
+            pace_segments = speech_segments
+            if transcript_segments and transcript_future is None:
+                pace_segments = self._segments_from_transcript(transcript_segments) or speech_segments
 
+            if transcript_future is not None:
+                transcript = transcript_future.result()
             if not isinstance(transcript, str) or not transcript.strip():
                 return self._create_error_result("No transcript provided for WPM analysis")
 
             word_count = self._count_words(transcript)
             wpm = self._calculate_wpm(word_count, duration)
 
-            speech_segments = self._detect_speech_segments(audio_data, sample_rate)
-            segment_analysis = self._analyze_segments(speech_segments, transcript)
-            pace_consistency = self._calculate_pace_consistency(segment_analysis)
+            segment_wpms = self._segment_wpms(pace_segments, word_count)
+            pace_consistency = self._calculate_pace_consistency(segment_wpms)
             pause_analysis = self._analyze_pauses(speech_segments, duration)
             assessment = self._assess_wpm(wpm, context)
             recommendations = self._generate_recommendations(wpm, pace_consistency, pause_analysis, context)
@@ -53,12 +154,12 @@ class WPMCalculator:
                     'status': self._get_consistency_status(pace_consistency)
                 },
                 'segment_analysis': {
-                    'segments': len(speech_segments),
-                    'avg_segment_wpm': round(np.mean([seg['wpm'] for seg in segment_analysis]), 1) if segment_analysis else 0,
-                    'wpm_variance': round(np.var([seg['wpm'] for seg in segment_analysis]), 1) if segment_analysis else 0
+                    'segments': len(pace_segments),
+                    'avg_segment_wpm': round(segment_wpms.mean(), 1) if segment_wpms.size else 0,
+                    'wpm_variance': round(segment_wpms.var(), 1) if segment_wpms.size else 0
                 },
                 'pause_analysis': pause_analysis,
-                'detailed_segments': segment_analysis[:10],
+                'detailed_segments': self._analyze_segments(pace_segments, word_count, segment_wpms),
                 'recommendations': recommendations,
                 'success': True
             }
@@ -66,12 +167,35 @@ class WPMCalculator:
             logger.error(f"Error in WPM analysis: {str(e)}")
             return self._create_error_result(f"Analysis failed: {str(e)}")
 
-    async def _get_transcription(self, audio_path: str, language: str = 'english') -> Optional[str]:
+    def load_audio(self, audio_path: str) -> Optional[np.ndarray]:
+        """Decode a clip once at SAMPLE_RATE for sharing with analyze() and the transcription service."""
+        try:
+            return self._decode(audio_path)
+        except Exception as e:
+            logger.error(f"Failed to load audio for WPM analysis: {e}")
+            return None
+
+    def _decode(self, audio_path: str) -> np.ndarray:
+        """Mono float32 at SAMPLE_RATE; resamples only when the file is at another rate."""
+        try:
+            audio_data, file_sr = sf.read(audio_path, dtype='float32')
+        except RuntimeError:
+            # Formats libsndfile cannot read (e.g. some compressed uploads) go through librosa/audioread
+            audio_data, _ = librosa.load(audio_path, sr=SAMPLE_RATE)
+            return audio_data
+        if audio_data.ndim > 1:
+            audio_data = audio_data.mean(axis=1, dtype=np.float32)
+        if file_sr != SAMPLE_RATE:
+            audio_data = librosa.resample(audio_data, orig_sr=file_sr, target_sr=SAMPLE_RATE)
+        return audio_data
+
+    async def _get_transcription(self, audio_path: str, language: str = 'english',
+                                 audio_data: Optional[np.ndarray] = None) -> Optional[str]:
         try:
             if language == 'arabic' and self.transcription_service_arabic:
-                return await self.transcription_service_arabic.get_transcription(audio_path, language)
+                return await self.transcription_service_arabic.get_transcription(audio_path, language, audio_data=audio_data)
             elif self.transcription_service_english:
-                return await self.transcription_service_english.get_transcription(audio_path, language)
+                return await self.transcription_service_english.get_transcription(audio_path, language, audio_data=audio_data)
             else:
                 return None
         except Exception as e:
@@ -81,8 +205,7 @@ class WPMCalculator:
     def _count_words(self, text: str) -> int:
         if not text:
             return 0
-        words = re.findall(r'\b\w+\b', text.lower())
-        return len(words)
+        return len(_WORD_RE.findall(text))
 
     def _calculate_wpm(self, word_count: int, duration_seconds: float) -> float:
         if duration_seconds <= 0:
@@ -92,71 +215,87 @@ class WPMCalculator:
     def _detect_speech_segments(self, audio_data: np.ndarray, sample_rate: int) -> List[Dict]:
         frame_length = int(0.025 * sample_rate)
         hop_length = int(0.010 * sample_rate)
-        energy = []
-        for i in range(0, len(audio_data) - frame_length, hop_length):
-            frame = audio_data[i:i + frame_length]
-            frame_energy = np.sum(frame ** 2)
-            energy.append(frame_energy)
-        energy = np.array(energy)
-        energy_threshold = np.percentile(energy, 30)
-        is_speech = energy > energy_threshold
+        # Keep the frame energies float32 (as decoded) even for caller-provided buffers; no float64 copy
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        n_frames = len(range(0, len(audio_data) - frame_length, hop_length))
+        frames = np.lib.stride_tricks.sliding_window_view(audio_data, frame_length)[::hop_length][:n_frames]
+        energy = np.einsum('ij,ij->i', frames, frames, dtype=np.float32)
+        # 30th percentile (linear interpolation, as np.percentile) from one quickselect of the two neighbouring ranks
+        position = 0.3 * (len(energy) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(energy) - 1)
+        ranked = np.partition(energy, (lower, upper))
+        energy_threshold = ranked[lower] + (ranked[upper] - ranked[lower]) * (position - lower)
+        # Frames are 10 ms apart, so runs must span more than 10 frames to exceed 100 ms
+        bounds = _speech_run_bounds(energy, energy_threshold, 10)
+        return [
+            {'start': start / 1000.0, 'end': end / 1000.0, 'duration': (end - start) / 1000.0}
+            for start, end in (bounds * 10).tolist()
+        ]
+
+    def _segments_from_transcript(self, transcript_segments: List[Dict]) -> List[Dict]:
+        """Transcriber segments as speech segments with their own word counts; empty or zero-length ones are dropped."""
         segments = []
-        start_time = None
-        for i, speech in enumerate(is_speech):
-            time_ms = i * 10
-            if speech and start_time is None:
-                start_time = time_ms
-            elif not speech and start_time is not None:
-                end_time = time_ms
-                duration = (end_time - start_time) / 1000.0
-                if duration > 0.1:
-                    segments.append({
-                        'start': start_time / 1000.0,
-                        'end': end_time / 1000.0,
-                        'duration': duration
-                    })
-                start_time = None
-        if start_time is not None:
-            end_time = len(is_speech) * 10
-            duration = (end_time - start_time) / 1000.0
-            if duration > 0.1:
-                segments.append({
-                    'start': start_time / 1000.0,
-                    'end': end_time / 1000.0,
-                    'duration': duration
-                })
+        for seg in transcript_segments:
+            start, end = float(seg['start']), float(seg['end'])
+            words = self._count_words(seg.get('text', ''))
+            if end > start and words:
+                segments.append({'start': start, 'end': end, 'duration': end - start, 'words': words})
         return segments
 
-    def _analyze_segments(self, segments: List[Dict], transcription: str) -> List[Dict]:
-        if not segments or not transcription:
+    def _segment_wpms(self, segments: List[Dict], total_words: int) -> np.ndarray:
+        """
+        Per-segment WPM for every segment, rounded as reported. Transcriber segments use their own 'words'
+        count; energy-VAD segments get the transcript's words spread evenly.
+        total_words is the word count as already computed by analyze().
+        """
+        if not segments:
+            return np.empty(0, dtype=np.float64)
+        if 'words' in segments[0]:
+            words = np.fromiter((seg['words'] for seg in segments), dtype=np.float64, count=len(segments))
+        else:
+            words = total_words / len(segments)
+        durations = np.fromiter((seg['duration'] for seg in segments), dtype=np.float64, count=len(segments))
+        # Same as _calculate_wpm per segment: zero for non-positive durations
+        wpms = np.divide(words, durations, out=np.zeros_like(durations), where=durations > 0) * 60
+        return np.round(wpms, 1)
+
+    def _analyze_segments(self, segments: List[Dict], total_words: int, segment_wpms: np.ndarray) -> List[Dict]:
+        """Detail dicts for the first MAX_DETAILED_SEGMENTS segments only; segment_wpms is from _segment_wpms."""
+        if not segments:
             return []
-        total_words = self._count_words(transcription)
-        words_per_segment = total_words / len(segments) if segments else 0
-        analyzed_segments = []
-        for i, segment in enumerate(segments):
-            segment_words = words_per_segment
-            segment_wpm = self._calculate_wpm(segment_words, segment['duration'])
-            analyzed_segments.append({
+        if 'words' in segments[0]:
+            estimated_words = [seg['words'] for seg in segments[:MAX_DETAILED_SEGMENTS]]
+        else:
+            estimated_words = [round(total_words / len(segments), 1)] * min(len(segments), MAX_DETAILED_SEGMENTS)
+        # start/end/duration rows for the returned segments, rounded in one batched call
+        times = np.round(np.array(
+            [(seg['start'], seg['end'], seg['duration']) for seg in segments[:MAX_DETAILED_SEGMENTS]],
+            dtype=np.float64
+        ), 2).tolist()
+        return [
+            {
                 'segment_id': i + 1,
-                'start_time': round(segment['start'], 2),
-                'end_time': round(segment['end'], 2),
-                'duration': round(segment['duration'], 2),
-                'estimated_words': round(segment_words, 1),
-                'wpm': round(segment_wpm, 1)
-            })
-        return analyzed_segments
-
-    def _calculate_pace_consistency(self, segment_analysis: List[Dict]) -> float:
-        if len(segment_analysis) < 2:
+                'start_time': start,
+                'end_time': end,
+                'duration': duration,
+                'estimated_words': words,
+                'wpm': wpm
+            }
+            for i, ((start, end, duration), words, wpm) in enumerate(
+                zip(times, estimated_words, segment_wpms[:MAX_DETAILED_SEGMENTS].tolist())
+            )
+        ]
+
+    def _calculate_pace_consistency(self, segment_wpms: np.ndarray) -> float:
+        if segment_wpms.size < 2:
             return 1.0
-        wpm_values = [seg['wpm'] for seg in segment_analysis if seg['wpm'] > 0]
-        if not wpm_values:
+        wpm_values = segment_wpms[segment_wpms > 0]
+        if wpm_values.size == 0:
             return 0.0
-        mean_wpm = np.mean(wpm_values)
-        std_wpm = np.std(wpm_values)
-        cv = std_wpm / mean_wpm if mean_wpm > 0 else 1.0
-        consistency_score = max(0, 1 - cv)
-        return consistency_score
+        mean_wpm = wpm_values.mean()
+        cv = wpm_values.std() / mean_wpm if mean_wpm > 0 else 1.0
+        return max(0, 1 - cv)
 
     def _analyze_pauses(self, segments: List[Dict], total_duration: float) -> Dict:
         if len(segments) < 2:
@@ -166,68 +305,59 @@ class WPMCalculator:
                 'average_pause_duration': 0,
                 'pause_count': 0
             }
-        pauses = []
-        for i in range(1, len(segments)):
-            pause_start = segments[i-1]['end']
-            pause_end = segments[i]['start']
-            pause_duration = pause_end - pause_start
-            if pause_duration > 0.1:
-                pauses.append(pause_duration)
-        total_pause_time = sum(pauses)
+        starts = np.fromiter((seg['start'] for seg in segments), dtype=np.float64, count=len(segments))
+        ends = np.fromiter((seg['end'] for seg in segments), dtype=np.float64, count=len(segments))
+        gaps = starts[1:] - ends[:-1]
+        pauses = gaps[gaps > 0.1]
+        total_pause_time = float(pauses.sum())
         pause_percentage = (total_pause_time / total_duration) * 100 if total_duration > 0 else 0
-        avg_pause_duration = np.mean(pauses) if pauses else 0
+        avg_pause_duration = float(pauses.mean()) if pauses.size else 0
         return {
             'total_pause_time': round(total_pause_time, 2),
             'pause_percentage': round(pause_percentage, 1),
             'average_pause_duration': round(avg_pause_duration, 2),
-            'pause_count': len(pauses)
+            'pause_count': int(pauses.size)
         }
 
     def _assess_wpm(self, wpm: float, context: str) -> Dict:
-        ranges = self.wpm_ranges.get(context, self.wpm_ranges['presentation'])
-        if wpm < ranges['min']:
+        min_wpm, max_wpm, optimal, optimal_range, optimal_target = self._context_limits(context)
+        if wpm < min_wpm:
             status = 'too_slow'
-            message = f"Speaking pace is too slow for {context}"
-        elif wpm > ranges['max']:
+        elif wpm > max_wpm:
             status = 'too_fast'
-            message = f"Speaking pace is too fast for {context}"
         else:
-            optimal = ranges['optimal']
             deviation = abs(wpm - optimal) / optimal
             if deviation < 0.1:
                 status = 'excellent'
-                message = f"Speaking pace is excellent for {context}"
             elif deviation < 0.2:
                 status = 'good'
-                message = f"Speaking pace is good for {context}"
             else:
                 status = 'acceptable'
-                message = f"Speaking pace is acceptable for {context}"
+        message = self._assessment_messages.get((context, status))
+        if message is None:
+            # Unknown contexts are scored against the presentation range but still named in the message
+            message = f"Speaking pace is {_ASSESSMENT_WORDING[status]} for {context}"
         return {
             'status': status,
             'message': message,
-            'optimal_range': f"{ranges['min']}-{ranges['max']} WPM",
-            'optimal_target': f"{ranges['optimal']} WPM"
+            'optimal_range': optimal_range,
+            'optimal_target': optimal_target
         }
 
+    def _context_limits(self, context: str) -> tuple:
+        return self._context_table.get(context) or self._context_table['presentation']
+
     def _get_consistency_status(self, consistency_score: float) -> str:
-        if consistency_score >= 0.8:
-            return 'excellent'
-        elif consistency_score >= 0.6:
-            return 'good'
-        elif consistency_score >= 0.4:
-            return 'fair'
-        else:
-            return 'poor'
+        return _CONSISTENCY_STATUSES[bisect.bisect_right(_CONSISTENCY_THRESHOLDS, consistency_score)]
 
     def _generate_recommendations(self, wpm: float, consistency: float, pause_analysis: Dict, context: str) -> List[str]:
         recommendations = []
-        ranges = self.wpm_ranges.get(context, self.wpm_ranges['presentation'])
-        if wpm < ranges['min']:
-            recommendations.append(f"Increase speaking pace. Target {ranges['optimal']} WPM for optimal {context} delivery.")
+        min_wpm, max_wpm, _, _, optimal_target = self._context_limits(context)
+        if wpm < min_wpm:
+            recommendations.append(f"Increase speaking pace. Target {optimal_target} for optimal {context} delivery.")
             recommendations.append("Practice speaking exercises to build confidence and fluency.")
-        elif wpm > ranges['max']:
-            recommendations.append(f"Slow down your speaking pace. Target {ranges['optimal']} WPM for better comprehension.")
+        elif wpm > max_wpm:
+            recommendations.append(f"Slow down your speaking pace. Target {optimal_target} for better comprehension.")
             recommendations.append("Focus on clear articulation and allow listeners time to process information.")
         if consistency < 0.6:
             recommendations.append("Work on maintaining consistent speaking pace throughout your presentation.")
@@ -251,8 +381,7 @@ class WPMCalculator:
         return recommendations
 
     def _calculate_overall_score(self, wpm: float, consistency: float, assessment: Dict, context: str) -> float:
-        ranges = self.wpm_ranges.get(context, self.wpm_ranges['presentation'])
-        min_wpm, max_wpm, optimal = ranges['min'], ranges['max'], ranges['optimal']
+        min_wpm, max_wpm, optimal, _, _ = self._context_limits(context)
         
         # Gradual penalty for being close to the boundary (within 10 WPM)
         if min_wpm - 10 <= wpm < min_wpm:
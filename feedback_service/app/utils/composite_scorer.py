@@ -55,6 +55,30 @@ class CompositeScorer:
             }
         }
         
+        # Model-specific score field mappings, tried in order; unknown models fall back to default_score_fields
+        self.score_mappings = {
+            "speech_emotion": ("emotional_intensity", "overall_score"),
+            "wpm_analysis": ("overall_score", "pace_consistency.score"),
+            "pitch_analysis": ("pitch_variety", "overall_score"),
+            "volume_consistency": ("consistency_score", "overall_score"),
+            "filler_detection": ("filler_frequency_score", "overall_score"),
+            "stutter_detection": ("fluency_score", "overall_score"),
+            "lexical_richness": ("lexical_diversity", "overall_score"),
+            "facial_emotion": ("engagement_metrics.engagement_score", "overall_score"),
+            "eye_contact": ("attention_score", "overall_score"),
+            "hand_gesture": ("overall_score", "gesture_effectiveness"),
+            "posture_analysis": ("posture_score", "overall_score"),
+            "keyword_relevance": ("overall_score", "relevance_score"),
+            "confidence_detector": ("overall_confidence_score", "overall_score")
+        }
+        self.default_score_fields = ("overall_score", "score")
+        # Same mappings with each field path split on "." up front, so extraction does no string work
+        self._score_paths = {
+            model_name: tuple(tuple(field.split(".")) for field in fields)
+            for model_name, fields in self.score_mappings.items()
+        }
+        self._default_score_paths = tuple(tuple(field.split(".")) for field in self.default_score_fields)
+        
         # Validate weights sum to approximately 1.0
         total_weight = sum(self.model_weights.values())
         if abs(total_weight - 1.0) > 0.001:
@@ -62,14 +86,28 @@ class CompositeScorer:
             # Normalize weights
             for key in self.model_weights:
                 self.model_weights[key] /= total_weight
+        
+        # Fallback weight for models without their own entry, looked up once after normalization
+        self._default_weight = self.model_weights.get("default", 0.05)
+        
+        # category -> ((model, weight), ...) derived once; the weights are final after normalization above
+        self._category_models = {
+            category_name: tuple(
+                (model_name, self.model_weights.get(model_name, self._default_weight))
+                for model_name in category_config["models"]
+            )
+            for category_name, category_config in self.scoring_categories.items()
+        }
     
     async def calculate_score(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate comprehensive weighted score from all available models."""
         try:
             logger.info("Starting composite score calculation...")
             
-            weighted_scores = []
+            # Running totals, in component order; for ~13 components this beats any buffered/NumPy reduction
+            weighted_sum = 0.0
             total_weight_used = 0.0
+            valid_components = 0
             component_info = {}
             
             for key, result in analysis_results.items():
@@ -90,16 +128,18 @@ class CompositeScorer:
                             normalized_score = score * 10
                         
                         # Get weight for this model
-                        weight = self.model_weights.get(key, self.model_weights.get("default", 0.05))
+                        weight = self.model_weights.get(key, self._default_weight)
                         
-                        weighted_scores.append((normalized_score, weight))
+                        weighted_sum += normalized_score * weight
                         total_weight_used += weight
+                        valid_components += 1
                         component_info[key] = {
                             "score": normalized_score,
                             "weight": weight,
                             "weighted_contribution": normalized_score * weight
                         }
-                        logger.info(f"Extracted score {normalized_score} with weight {weight} from {key}")
+                        # Per component, so lazily formatted and below INFO; the overall score is logged after the loop
+                        logger.debug("Extracted score %s with weight %s from %s", normalized_score, weight, key)
                     else:
                         logger.warning(f"No valid score found in {key}")
                         component_info[key] = {"status": "no_score", "weight": 0.0, "score": -1.0}
@@ -109,10 +149,9 @@ class CompositeScorer:
                     component_info[key] = {"status": f"error: {str(e)}", "weight": 0.0, "score": -1.0}
             
             # Calculate weighted overall score
-            if weighted_scores and total_weight_used > 0:
-                weighted_sum = sum(score * weight for score, weight in weighted_scores)
+            if valid_components and total_weight_used > 0:
                 overall_score = weighted_sum / total_weight_used
-                logger.info(f"Calculated weighted overall score: {overall_score} from {len(weighted_scores)} components")
+                logger.info(f"Calculated weighted overall score: {overall_score} from {valid_components} components")
             else:
                 overall_score = 5.0
                 logger.warning("No scores extracted, using default")
@@ -120,7 +159,7 @@ class CompositeScorer:
             # Calculate category scores
             category_scores = {}
             for category_name, category_config in self.scoring_categories.items():
-                category_score = self._calculate_category_score(component_info, category_config["models"])
+                category_score = self._calculate_category_score(component_info, self._category_models[category_name])
                 category_scores[category_name] = {
                     "score": category_score,
                     "description": category_config["description"],
@@ -132,7 +171,7 @@ class CompositeScorer:
                 "category_scores": category_scores,
                 "component_breakdown": component_info,
                 "total_components": len(analysis_results),
-                "valid_components": len(weighted_scores),
+                "valid_components": valid_components,
                 "total_weight_used": round(total_weight_used, 3)
             }
             
@@ -145,27 +184,10 @@ class CompositeScorer:
     def _extract_score_enhanced(self, model_name: str, result: Dict[str, Any]) -> float:
         """Enhanced score extraction with better field mapping."""
         try:
-            # Model-specific score field mappings
-            score_mappings = {
-                "speech_emotion": ["emotional_intensity", "overall_score"],
-                "wpm_analysis": ["overall_score", "pace_consistency.score"],
-                "pitch_analysis": ["pitch_variety", "overall_score"],
-                "volume_consistency": ["consistency_score", "overall_score"],
-                "filler_detection": ["filler_frequency_score", "overall_score"],
-                "stutter_detection": ["fluency_score", "overall_score"],
-                "lexical_richness": ["lexical_diversity", "overall_score"],
-                "facial_emotion": ["engagement_metrics.engagement_score", "overall_score"],
-                "eye_contact": ["attention_score", "overall_score"],
-                "hand_gesture": ["overall_score", "gesture_effectiveness"],
-                "posture_analysis": ["posture_score", "overall_score"],
-                "keyword_relevance": ["overall_score", "relevance_score"],
-                "confidence_detector": ["overall_confidence_score", "overall_score"]
-            }
-            
-            fields_to_try = score_mappings.get(model_name, ["overall_score", "score"])
+            paths_to_try = self._score_paths.get(model_name, self._default_score_paths)
             
-            for field in fields_to_try:
-                score = self._extract_nested_field(result, field)
+            for path in paths_to_try:
+                score = self._extract_nested_field(result, path)
                 if score is not None and score != -1.0:
                     return score
             
@@ -175,20 +197,19 @@ class CompositeScorer:
             logger.error(f"Error extracting score from {model_name}: {e}")
             return -1.0
     
-    def _extract_nested_field(self, data: Dict[str, Any], field_path: str) -> float:
-        """Extract value from nested field path like 'engagement_metrics.engagement_score'."""
+    def _extract_nested_field(self, data: Dict[str, Any], path: tuple) -> float:
+        """Extract value from a pre-split field path like ('engagement_metrics', 'engagement_score')."""
         try:
-            if "." in field_path:
-                parts = field_path.split(".")
+            if len(path) == 1:
+                value = data.get(path[0])
+            else:
                 current = data
-                for part in parts:
+                for part in path:
                     if isinstance(current, dict) and part in current:
                         current = current[part]
                     else:
                         return -1.0
                 value = current
-            else:
-                value = data.get(field_path)
             
             if value is None:
                 return -1.0
@@ -203,24 +224,28 @@ class CompositeScorer:
         except (ValueError, TypeError, KeyError):
             return -1.0
     
-    def _calculate_category_score(self, component_info: Dict[str, Any], model_names: list) -> float:
-        """Calculate weighted score for a specific category of models"""
+    def _calculate_category_score(self, component_info: Dict[str, Any], category_models: tuple) -> float:
+        """
+        Calculate weighted score for a specific category of models.
+        category_models holds (model, weight) pairs from _category_models; a scored component's weight in
+        component_info is always its model weight, so the precomputed one is used directly.
+        """
         try:
-            category_scores = []
-            category_weights = []
+            # Single pass, summing in model order as before
+            weighted_sum = 0.0
+            total_weight = 0.0
             
-            for model_name in model_names:
-                if model_name in component_info:
-                    info = component_info[model_name]
-                    if isinstance(info, dict) and "score" in info and "weight" in info:
-                        # Only include valid scores (not -1.0)
-                        if info["score"] != -1.0:
-                            category_scores.append(info["score"])
-                            category_weights.append(info["weight"])
+            for model_name, weight in category_models:
+                info = component_info.get(model_name)
+                if isinstance(info, dict) and "score" in info:
+                    score = info["score"]
+                    # Only include valid scores (not -1.0)
+                    if score != -1.0:
+                        weighted_sum += score * weight
+                        total_weight += weight
             
-            if category_scores and sum(category_weights) > 0:
-                weighted_sum = sum(score * weight for score, weight in zip(category_scores, category_weights))
-                return weighted_sum / sum(category_weights)
+            if total_weight > 0:
+                return weighted_sum / total_weight
             else:
                 return 5.0  # Default score if no models in category
         except Exception as e:
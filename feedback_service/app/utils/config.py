@@ -23,6 +23,9 @@ class Config:
         
         # Whisper settings
         self.whisper_model_size = os.getenv("WHISPER_MODEL_SIZE", "small")  # 'tiny', 'base', 'small', 'medium', 'large'
+        self.whisper_compute_type = os.getenv("WHISPER_COMPUTE_TYPE", "int8")  # faster-whisper: 'int8', 'int8_float32', 'float32'
+        self.whisper_cuda_compute_type = os.getenv("WHISPER_CUDA_COMPUTE_TYPE", "float16")  # used instead on a GPU: 'float16', 'int8_float16'
+        self.whisper_num_workers = int(os.getenv("WHISPER_NUM_WORKERS", "1"))  # parallel faster-whisper transcriptions
     
     def get_transcription_config(self) -> Dict[str, Any]:
         """Get transcription configuration for models"""
@@ -42,6 +45,9 @@ class Config:
         """Get Whisper configuration"""
         return {
             "model_size": self.whisper_model_size,
+            "compute_type": self.whisper_compute_type,
+            "cuda_compute_type": self.whisper_cuda_compute_type,
+            "num_workers": self.whisper_num_workers,
             "supported_languages": ["ar", "en", "auto"],
             "supported_models": ["tiny", "base", "small", "medium", "large"]
         }
@@ -1,12 +1,24 @@
 import os
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 import tempfile
 
 logger = logging.getLogger(__name__)
 
+TRANSCRIPTION_CACHE_DIR = os.environ.get(
+    "TRANSCRIPTION_CACHE_DIR", os.path.expanduser("~/.mockpie/cache/transcriptions")
+)
+MAX_CACHED_TRANSCRIPTIONS = 256
+# Transcriptions kept on disk; the least recently used (by file mtime) are deleted beyond this
+MAX_DISK_CACHED_TRANSCRIPTIONS = 4096
+
 class TranscriptionService:
     """
     Centralized transcription service that handles audio transcription once
@@ -14,12 +26,20 @@ class TranscriptionService:
     """
     
     def __init__(self, whisper_transcriber=None):
-        self._transcription_cache = {}  # Cache transcriptions by audio path
+        # (transcription, timed segments or None) keyed by audio content hash + language (LRU);
+        # upload paths are reused, so never by path
+        self._transcription_cache: "OrderedDict[str, Tuple[str, Optional[List[Dict[str, Any]]]]]" = OrderedDict()
+        # The cache is read and written from executor threads, and OrderedDict reordering is not thread-safe
+        self._cache_lock = threading.Lock()
+        self._cache_dir = Path(TRANSCRIPTION_CACHE_DIR)
         self._transcription_config = {
             "method": "wit",
             "language": "english"
         }
         self._whisper_transcriber = whisper_transcriber
+        # cache_key -> Future of the transcription being computed; thread-safe, since analyzers await
+        # the service from their own event loops
+        self._in_flight: Dict[str, Future] = {}
     
     def set_config(self, method: str = "wit", language: str = "english"):
         """Set transcription configuration"""
@@ -29,42 +49,168 @@ class TranscriptionService:
         }
         logger.info(f"Transcription service configured: method={method}, language={language}")
     
-    async def get_transcription(self, audio_path: str, language: str, force_refresh: bool = False) -> Optional[str]:
+    async def get_transcription(self, audio_path: str, language: str, force_refresh: bool = False,
+                                audio_data=None) -> Optional[str]:
+        """
+        Get transcription for audio file. Results are cached by audio content and language,
+        in memory and on disk, so the same recording is only sent to the STT backend once.
+        audio_data is an optional 16 kHz mono float32 decode of audio_path; Whisper uses it instead
+        of decoding the file again.
+        """
+        transcription, _ = await self.get_transcription_with_segments(audio_path, language, force_refresh, audio_data)
+        return transcription
+
+    async def get_transcription_with_segments(
+        self, audio_path: str, language: str, force_refresh: bool = False, audio_data=None
+    ) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]]]:
         """
-        Get transcription for audio file, always perform a fresh transcription (no cache)
+        Like get_transcription, but also returns the transcriber's timed segments
+        ([{"start", "end", "text"}, ...]) when the backend provides them (Whisper), else None.
         """
         try:
-            # Always perform transcription (no cache)
-            logger.info(f"Transcribing audio: {audio_path} (lang: {language}) [no cache]")
-            transcription = await self._perform_transcription(audio_path, language)
-            return transcription
+            loop = asyncio.get_event_loop()
+            cache_key = await loop.run_in_executor(None, self._cache_key, audio_path, language)
+            if not force_refresh:
+                cached = await loop.run_in_executor(None, self._read_cache, cache_key)
+                if cached is not None:
+                    logger.info(f"Using cached transcription for {audio_path} (lang: {language})")
+                    return cached
+            # Concurrent requests for the same recording share one transcription instead of each running the model
+            future = Future()
+            pending = self._in_flight.setdefault(cache_key, future)
+            if pending is not future:
+                logger.info(f"Waiting for in-flight transcription of {audio_path} (lang: {language})")
+                return await asyncio.wrap_future(pending)
+            result = (None, None)
+            try:
+                logger.info(f"Transcribing audio: {audio_path} (lang: {language})")
+                result = await self._perform_transcription(audio_path, language, audio_data)
+                if result[0]:
+                    await loop.run_in_executor(None, self._write_cache, cache_key, *result)
+            finally:
+                self._in_flight.pop(cache_key, None)
+                future.set_result(result)
+            return result
         except Exception as e:
             logger.error(f"Error getting transcription for {audio_path}: {e}")
+            return None, None
+
+    def _cache_key(self, audio_path: str, language: str) -> str:
+        """Audio content hash, language and a tag for the backend that produced the transcription."""
+        backend_tag = hashlib.sha1(self._backend_identity().encode("utf-8")).hexdigest()[:12]
+        return f"{self._file_digest(audio_path)}_{language.lower()}_{backend_tag}"
+
+    def _file_digest(self, audio_path: str) -> str:
+        digest = hashlib.sha1()
+        with open(audio_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _backend_identity(self) -> str:
+        """Transcription method and Whisper model settings, so a config or model change misses the disk cache."""
+        if self._whisper_transcriber:
+            whisper = self._whisper_transcriber
+            model = (whisper.model_size, whisper.compute_type, getattr(whisper, "cuda_compute_type", None))
+        else:
+            from app.utils.config import config
+            whisper_config = config.get_whisper_config()
+            model = (whisper_config["model_size"], whisper_config["compute_type"], whisper_config["cuda_compute_type"])
+        return "|".join(str(part) for part in (self._transcription_config["method"], *model))
+
+    def _read_cache(self, cache_key: str) -> Optional[Tuple[str, Optional[List[Dict[str, Any]]]]]:
+        """Memory first, then disk (promoting disk hits into memory)."""
+        with self._cache_lock:
+            entry = self._transcription_cache.get(cache_key)
+            if entry is not None:
+                self._transcription_cache.move_to_end(cache_key)
+                return entry
+        text_path = self._cache_dir / f"{cache_key}.txt"
+        try:
+            transcription = text_path.read_text(encoding="utf-8")
+            # Refresh the mtime so disk eviction drops the least recently used entries
+            os.utime(text_path)
+        except OSError:
             return None
+        try:
+            segments = json.loads((self._cache_dir / f"{cache_key}.segments.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            segments = None
+        entry = (transcription, segments)
+        self._remember(cache_key, entry)
+        return entry
+
+    def _write_cache(self, cache_key: str, transcription: str, segments: Optional[List[Dict[str, Any]]] = None):
+        self._remember(cache_key, (transcription, segments))
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            # Segments first, so a transcription on disk implies its segments (if any) are there too
+            if segments is not None:
+                self._write_atomic(f"{cache_key}.segments.json", json.dumps(segments))
+            self._write_atomic(f"{cache_key}.txt", transcription)
+            self._evict_disk_cache()
+        except OSError as e:
+            logger.warning(f"Could not persist transcription cache entry: {e}")
+
+    def _evict_disk_cache(self):
+        """Delete the oldest on-disk entries beyond MAX_DISK_CACHED_TRANSCRIPTIONS."""
+        entries = []
+        for text_path in self._cache_dir.glob("*.txt"):
+            try:
+                entries.append((text_path.stat().st_mtime, text_path))
+            except OSError:
+                continue
+        if len(entries) <= MAX_DISK_CACHED_TRANSCRIPTIONS:
+            return
+        entries.sort()
+        for _, text_path in entries[:len(entries) - MAX_DISK_CACHED_TRANSCRIPTIONS]:
+            # Transcription first, so a transcription on disk still implies its segments are there
+            text_path.unlink(missing_ok=True)
+            text_path.with_name(f"{text_path.stem}.segments.json").unlink(missing_ok=True)
+
+    def _write_atomic(self, filename: str, content: str):
+        # A unique temp file per write, so concurrent writers of the same entry never share one
+        tmp_file = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self._cache_dir,
+                                               prefix=f"{filename}.", suffix=".tmp", delete=False)
+        try:
+            with tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_file.name, self._cache_dir / filename)
+        except OSError:
+            Path(tmp_file.name).unlink(missing_ok=True)
+            raise
+
+    def _remember(self, cache_key: str, entry: Tuple[str, Optional[List[Dict[str, Any]]]]):
+        with self._cache_lock:
+            self._transcription_cache[cache_key] = entry
+            self._transcription_cache.move_to_end(cache_key)
+            while len(self._transcription_cache) > MAX_CACHED_TRANSCRIPTIONS:
+                self._transcription_cache.popitem(last=False)
     
-    async def _perform_transcription(self, audio_path: str, language: str) -> Optional[str]:
-        """Perform the actual transcription with automatic language-based routing"""
+    async def _perform_transcription(self, audio_path: str, language: str,
+                                     audio_data=None) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]]]:
+        """Perform the actual transcription with automatic language-based routing; Wit.ai gives no segments"""
         print("--------------------------------")
         print(f"Performing transcription for {audio_path} with language: {language}")
         try:
             # Route to appropriate transcription service based on language
             if language.lower() in ["arabic", "ar"]:
                 logger.info("Using Wit.ai for Arabic transcription")
-                return await self._transcribe_with_wit(audio_path, language)
+                return await self._transcribe_with_wit(audio_path, language), None
             else:
                 logger.info("Using Whisper for English/other language transcription")
-                return await self._transcribe_with_whisper(audio_path, language)
+                return await self._transcribe_with_whisper(audio_path, language, audio_data)
                 
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
             # Fallback to configured method
             if self._transcription_config["method"] == "wit":
-                return await self._transcribe_with_wit(audio_path, language)
+                return await self._transcribe_with_wit(audio_path, language), None
             elif self._transcription_config["method"] == "whisper":
-                return await self._transcribe_with_whisper(audio_path, language)
+                return await self._transcribe_with_whisper(audio_path, language, audio_data)
             else:
                 logger.warning(f"Unknown transcription method: {self._transcription_config['method']}")
-                return None
+                return None, None
     
     async def _transcribe_with_wit(self, audio_path: str, language: str = "arabic") -> Optional[str]:
         """Transcribe using Wit.ai"""
@@ -86,8 +232,9 @@ class TranscriptionService:
             logger.error(f"Wit.ai transcription failed: {e}")
             return None
     
-    async def _transcribe_with_whisper(self, audio_path: str, language: str = "english") -> Optional[str]:
-        """Transcribe using Whisper"""
+    async def _transcribe_with_whisper(self, audio_path: str, language: str = "english",
+                                       audio_data=None) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]]]:
+        """Transcribe using Whisper, returning (transcription, timed segments)"""
         try:
             # Use the configured Whisper transcriber if available
             if self._whisper_transcriber:
@@ -98,7 +245,7 @@ class TranscriptionService:
                 from app.utils.whisper_transcriber import WhisperTranscriber
                 from app.utils.config import config
                 whisper_config = config.get_whisper_config()
-                whisper_transcriber = WhisperTranscriber(whisper_config["model_size"])
+                whisper_transcriber = WhisperTranscriber(whisper_config["model_size"], whisper_config["compute_type"], whisper_config["num_workers"], whisper_config["cuda_compute_type"])
                 await whisper_transcriber.load_model()
                 logger.info(f"Created new Whisper transcriber with model: {whisper_config['model_size']}")
             
@@ -112,18 +259,21 @@ class TranscriptionService:
             whisper_language = language_map.get(language.lower(), "en")
             
             # Use Whisper transcriber
-            transcription = await whisper_transcriber.transcribe(
+            result = await whisper_transcriber.transcribe_with_segments(
                 audio_path, 
-                whisper_language
+                whisper_language,
+                audio_data=audio_data
             )
             
-            return transcription
+            if not result:
+                return None, None
+            return result["text"], result["segments"]
             
         except Exception as e:
             logger.error(f"Whisper transcription failed: {e}")
             # Fallback to Wit.ai if Whisper fails
             logger.info("Falling back to Wit.ai transcription")
-            return await self._transcribe_with_wit(audio_path, language)
+            return await self._transcribe_with_wit(audio_path, language), None
     
     async def _detect_language_with_whisper(self, audio_path: str) -> str:
         """Detect language using Whisper"""
@@ -136,7 +286,7 @@ class TranscriptionService:
                 from app.utils.whisper_transcriber import WhisperTranscriber
                 from app.utils.config import config
                 whisper_config = config.get_whisper_config()
-                temp_whisper = WhisperTranscriber(whisper_config["model_size"])
+                temp_whisper = WhisperTranscriber(whisper_config["model_size"], whisper_config["compute_type"], whisper_config["num_workers"], whisper_config["cuda_compute_type"])
                 await temp_whisper.load_model()
                 language = await temp_whisper.detect_language(audio_path)
                 return language or "english"
@@ -144,25 +294,45 @@ class TranscriptionService:
             logger.error(f"Language detection failed: {e}")
             return "english"  # Default to English
     
-    def get_cached_transcription(self, audio_path: str) -> Optional[str]:
+    def get_cached_transcription(self, audio_path: str, language: Optional[str] = None) -> Optional[str]:
         """Get cached transcription without performing new transcription"""
-        return self._transcription_cache.get(audio_path)
+        try:
+            entry = self._read_cache(self._cache_key(audio_path, language or self._transcription_config["language"]))
+        except OSError:
+            return None
+        return entry[0] if entry else None
     
     def clear_cache(self, audio_path: Optional[str] = None):
-        """Clear transcription cache"""
+        """Clear transcription cache (memory and disk)"""
         if audio_path:
-            if audio_path in self._transcription_cache:
-                del self._transcription_cache[audio_path]
-                logger.info(f"Cleared cache for: {audio_path}")
+            try:
+                digest = self._file_digest(audio_path)
+            except OSError as e:
+                logger.warning(f"Could not clear cache for {audio_path}: {e}")
+                return
+            with self._cache_lock:
+                for cache_key in [key for key in self._transcription_cache if key.startswith(f"{digest}_")]:
+                    del self._transcription_cache[cache_key]
+            for pattern in (f"{digest}_*.txt", f"{digest}_*.segments.json"):
+                for cached_file in self._cache_dir.glob(pattern):
+                    cached_file.unlink(missing_ok=True)
+            logger.info(f"Cleared cache for: {audio_path}")
         else:
-            self._transcription_cache.clear()
+            with self._cache_lock:
+                self._transcription_cache.clear()
+            for pattern in ("*.txt", "*.segments.json"):
+                for cached_file in self._cache_dir.glob(pattern):
+                    cached_file.unlink(missing_ok=True)
             logger.info("Cleared all transcription cache")
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
+        with self._cache_lock:
+            cache_keys = list(self._transcription_cache.keys())
         return {
-            "cached_transcriptions": len(self._transcription_cache),
-            "cache_keys": list(self._transcription_cache.keys()),
+            "cached_transcriptions": len(cache_keys),
+            "cache_dir": str(self._cache_dir),
+            "cache_keys": cache_keys,
             "config": self._transcription_config
         }
     
@@ -16,21 +16,33 @@ WHISPER_MODELS = {
     "large": "large"
 }
 
+# faster-whisper's silence filter: skip stretches of at least this much silence before decoding
+FASTER_WHISPER_VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+
 class WhisperTranscriber:
     """
     Whisper-based transcription service with support for multiple languages
     including Arabic and English
     """
     
-    def __init__(self, model_size: str = "base"):
+    def __init__(self, model_size: str = "base", compute_type: str = "int8", num_workers: int = 1,
+                 cuda_compute_type: str = "float16"):
         """
         Initialize Whisper transcriber
         
         Args:
             model_size: Size of Whisper model to use ("tiny", "base", "small", "medium", "large")
+            compute_type: faster-whisper (CTranslate2) weight type on CPU, e.g. "int8", "int8_float32", "float32"
+            num_workers: faster-whisper workers, i.e. how many transcriptions run in parallel across threads
+            cuda_compute_type: faster-whisper weight type when a CUDA GPU is available, e.g. "float16", "int8_float16"
         """
         self.model_size = model_size
+        self.compute_type = compute_type
+        self.cuda_compute_type = cuda_compute_type
+        self.num_workers = num_workers
+        self.device = "cpu"
         self.model = None
+        self.backend = None
         self._model_loaded = False
         
     async def load_model(self):
@@ -46,31 +58,120 @@ class WhisperTranscriber:
             self.model = await loop.run_in_executor(None, self._load_whisper_model)
             
             self._model_loaded = True
-            logger.info(f"Whisper model {self.model_size} loaded successfully")
+            logger.info(f"Whisper model {self.model_size} loaded successfully ({self.backend})")
             
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {e}")
             raise
     
     def _load_whisper_model(self):
-        """Load Whisper model synchronously"""
+        """Load Whisper model synchronously, preferring faster-whisper (on CUDA when available) over openai-whisper"""
+        try:
+            from faster_whisper import WhisperModel
+            self.backend = "faster-whisper"
+            if self._cuda_available():
+                try:
+                    model = WhisperModel(self.model_size, device="cuda", compute_type=self.cuda_compute_type,
+                                         num_workers=self.num_workers)
+                    self.device = "cuda"
+                    return model
+                except Exception as e:
+                    logger.warning(f"faster-whisper could not use CUDA, falling back to CPU: {e}")
+            self.device = "cpu"
+            return WhisperModel(self.model_size, device="cpu", compute_type=self.compute_type,
+                                num_workers=self.num_workers)
+        except ImportError:
+            logger.warning("faster-whisper not installed, falling back to openai-whisper")
         try:
             import whisper
-            return whisper.load_model(self.model_size)
+            self.backend = "openai-whisper"
+            self.device = "cuda" if self._cuda_available() else "cpu"
+            return whisper.load_model(self.model_size, device=self.device)
+        except ImportError:
+            raise ImportError("Whisper not installed. Run: pip install faster-whisper")
+
+    def _cuda_available(self) -> bool:
+        try:
+            import torch
+            return torch.cuda.is_available()
         except ImportError:
-            raise ImportError("Whisper not installed. Run: pip install openai-whisper")
+            return False
+
+    def _run_model(self, audio, language: str, word_timestamps: bool = False) -> Dict[str, Any]:
+        """
+        Transcribe a path or 16 kHz float32 array with the loaded backend.
+        Always returns an openai-whisper style result: text, segments (with words) and language.
+        """
+        language = None if language == "auto" else language
+        if self.backend == "openai-whisper":
+            options = {
+                "task": "transcribe",
+                "verbose": False,
+                "fp16": False,  # Disable for better compatibility
+                "word_timestamps": word_timestamps
+            }
+            if language:
+                options["language"] = language
+            return self.model.transcribe(audio, **options)
+
+        # Greedy decoding, as openai-whisper's default; silence is dropped before the decoder runs
+        segments, info = self.model.transcribe(
+            audio,
+            language=language,
+            task="transcribe",
+            beam_size=1,
+            word_timestamps=word_timestamps,
+            vad_filter=True,
+            vad_parameters=FASTER_WHISPER_VAD_PARAMETERS
+        )
+        # Segments are generated lazily; consuming them is what runs the decoder
+        segments = list(segments)
+        return {
+            # Segment texts carry their own leading spaces, as in openai-whisper
+            "text": "".join(segment.text for segment in segments),
+            "segments": [
+                {
+                    "start": segment.start,
+                    "end": segment.end,
+                    "text": segment.text,
+                    "words": [
+                        {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+                        for word in (segment.words or [])
+                    ]
+                }
+                for segment in segments
+            ],
+            "language": info.language
+        }
     
-    async def transcribe(self, audio_path: str, language: str = "auto") -> Optional[str]:
+    async def transcribe(self, audio_path: str, language: str = "auto", audio_data=None) -> Optional[str]:
         """
         Transcribe audio file using Whisper
         
         Args:
             audio_path: Path to audio file
             language: Language code ("ar" for Arabic, "en" for English, "auto" for auto-detect)
+            audio_data: Optional 16 kHz mono float32 decode of audio_path, used instead of re-decoding it
             
         Returns:
             Transcribed text or None if failed
         """
+        result = await self.transcribe_with_segments(audio_path, language, audio_data)
+        return result["text"] if result else None
+    
+    async def transcribe_with_segments(self, audio_path: str, language: str = "auto",
+                                       audio_data=None) -> Optional[Dict[str, Any]]:
+        """
+        Transcribe audio file using Whisper, keeping Whisper's segment timings
+        
+        Args:
+            audio_path: Path to audio file
+            language: Language code ("ar" for Arabic, "en" for English, "auto" for auto-detect)
+            audio_data: Optional 16 kHz mono float32 decode of audio_path, used instead of re-decoding it
+            
+        Returns:
+            {"text": str, "segments": [{"start", "end", "text"}, ...]} or None if failed
+        """
         try:
             # Ensure model is loaded
             if not self._model_loaded:
@@ -84,13 +185,18 @@ class WhisperTranscriber:
                 None, 
                 self._transcribe_sync, 
                 audio_path, 
-                language
+                language,
+                audio_data
             )
             
             if result and "text" in result:
                 transcription = result["text"].strip()
                 logger.info(f"Transcription completed: {len(transcription)} characters")
-                return transcription
+                segments = [
+                    {"start": segment["start"], "end": segment["end"], "text": segment["text"]}
+                    for segment in result.get("segments", [])
+                ]
+                return {"text": transcription, "segments": segments}
             else:
                 logger.warning("Whisper returned empty result")
                 return None
@@ -99,27 +205,14 @@ class WhisperTranscriber:
             logger.error(f"Whisper transcription failed: {e}")
             return None
     
-    def _transcribe_sync(self, audio_path: str, language: str) -> Optional[Dict[str, Any]]:
+    def _transcribe_sync(self, audio_path: str, language: str, audio_data=None) -> Optional[Dict[str, Any]]:
         """Synchronous transcription method"""
         try:
-            if not os.path.exists(audio_path):
+            if audio_data is None and not os.path.exists(audio_path):
                 logger.error(f"Audio file not found: {audio_path}")
                 return None
             
-            # Prepare transcription options
-            options = {
-                "task": "transcribe",
-                "verbose": False,
-                "fp16": False  # Disable for better compatibility
-            }
-            
-            # Set language if specified
-            if language != "auto":
-                options["language"] = language
-            
-            # Perform transcription
-            result = self.model.transcribe(audio_path, **options)
-            return result
+            return self._run_model(audio_path if audio_data is None else audio_data, language)
             
         except Exception as e:
             logger.error(f"Sync transcription failed: {e}")
@@ -162,18 +255,7 @@ class WhisperTranscriber:
             if not os.path.exists(audio_path):
                 return None
             
-            options = {
-                "task": "transcribe",
-                "verbose": False,
-                "fp16": False,
-                "word_timestamps": True
-            }
-            
-            if language != "auto":
-                options["language"] = language
-            
-            result = self.model.transcribe(audio_path, **options)
-            return result
+            return self._run_model(audio_path, language, word_timestamps=True)
             
         except Exception as e:
             logger.error(f"Timestamp sync transcription failed: {e}")
@@ -214,8 +296,13 @@ class WhisperTranscriber:
             if not os.path.exists(audio_path):
                 return None
             
+            if self.backend == "faster-whisper":
+                # The language is detected before any segment is decoded; the generator is never consumed
+                _, info = self.model.transcribe(audio_path, beam_size=1)
+                return info.language
+            
             # Load audio and detect language
-            result = self.model.transcribe(audio_path, task="transcribe", verbose=False)
+            result = self._run_model(audio_path, "auto")
             return result.get("language")
             
         except Exception as e:
@@ -243,6 +330,10 @@ class WhisperTranscriber:
         """Get information about the loaded model"""
         return {
             "model_size": self.model_size,
+            "compute_type": self.cuda_compute_type if self.device == "cuda" else self.compute_type,
+            "device": self.device,
+            "num_workers": self.num_workers,
+            "backend": self.backend,
             "model_loaded": self._model_loaded,
             "supported_languages": self.get_supported_languages()
         }
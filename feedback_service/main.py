@@ -83,7 +83,7 @@ async def startup_event():
         try:
             from app.utils.whisper_transcriber import WhisperTranscriber
             whisper_config = config.get_whisper_config()
-            whisper_transcriber = WhisperTranscriber(whisper_config["model_size"])
+            whisper_transcriber = WhisperTranscriber(whisper_config["model_size"], whisper_config["compute_type"], whisper_config["num_workers"], whisper_config["cuda_compute_type"])
             logger.info(f"Whisper transcriber initialized with model: {whisper_config['model_size']}")
         except Exception as e:
             logger.error(f"Failed to initialize Whisper transcriber: {e}")
@@ -193,7 +193,10 @@ async def analyze_full(file: UploadFile = File(...)):
         
         try:
             logger.info("Starting WPM analysis...")
-            wpm_result = await analyzers["wpm_calculator"].analyze(audio_path, language='english', context='presentation')
+            # Decoding, VAD and the transcript fetch all block, so run them off the event loop
+            wpm_result = await asyncio.get_event_loop().run_in_executor(
+                None, analyzers["wpm_calculator"].analyze, audio_path, 'english', 'presentation'
+            )
             results["wpm_analysis"] = wpm_result if isinstance(wpm_result, dict) else {"error": "Invalid result"}
             logger.info("WPM analysis completed")
         except Exception as e:
@@ -211,7 +214,7 @@ async def analyze_full(file: UploadFile = File(...)):
         
         try:
             logger.info("Starting volume consistency analysis...")
-            volume_result = await analyzers["volume_consistency"].analyze(audio_path)
+            volume_result = analyzers["volume_consistency"].analyze(audio_path)
             results["volume_consistency"] = volume_result if isinstance(volume_result, dict) else {"error": "Invalid result"}
             logger.info("Volume consistency analysis completed")
         except Exception as e:
@@ -229,7 +232,7 @@ async def analyze_full(file: UploadFile = File(...)):
         
         try:
             logger.info("Starting stutter detection analysis...")
-            stutter_result = await analyzers["stutter_detection"].analyze(audio_path)
+            stutter_result = analyzers["stutter_detection"].analyze(audio_path)
             results["stutter_detection"] = stutter_result if isinstance(stutter_result, dict) else {"error": "Invalid result"}
             logger.info("Stutter detection analysis completed")
         except Exception as e: